@@ -1,10 +1,134 @@
 from decouple import config
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker, Session as OrmSession
+import asyncio
+
+from .cache import TTLCache
+from .db_pool import PoolMonitor, pool_options, DB_POOL_WARMUP
 
 
 DB_URL = config('DB_URL')
 
 
-engine = create_engine(DB_URL, pool_pre_ping=True)
-Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+def _async_url(url: str):
+    # postgresql:// e postgresql+psycopg2:// viram postgresql+asyncpg:// para o engine assíncrono.
+    parsed = make_url(url)
+    if parsed.drivername in ("postgresql", "postgresql+psycopg2"):
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed
+
+
+ASYNC_DB_URL = config('ASYNC_DB_URL', default=None) or _async_url(DB_URL)
+
+# Réplica de leitura opcional: sem ela, tudo vai para o primário.
+DB_REPLICA_URL = config('DB_REPLICA_URL', default=None)
+ASYNC_DB_REPLICA_URL = config('ASYNC_DB_REPLICA_URL', default=None) or (_async_url(DB_REPLICA_URL) if DB_REPLICA_URL else None)
+# Depois de escrever, o usuário lê do primário por esse tempo (lag da réplica).
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=5, cast=float)
+REPLICA_STICKY_MAX_USERS = config('REPLICA_STICKY_MAX_USERS', default=100000, cast=int)
+
+
+pool_monitors = {
+    "sync": PoolMonitor("sync"),
+    "async": PoolMonitor("async"),
+}
+if ASYNC_DB_REPLICA_URL:
+    pool_monitors["async_replica"] = PoolMonitor("async_replica")
+
+engine = create_engine(DB_URL, **pool_options(pool_monitors["sync"]))
+Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Usado pelas rotas: o I/O com o banco não ocupa uma thread do threadpool durante a espera.
+async_engine = create_async_engine(ASYNC_DB_URL, **pool_options(pool_monitors["async"], is_async=True))
+async_replica_engine = (
+    create_async_engine(ASYNC_DB_REPLICA_URL, **pool_options(pool_monitors["async_replica"], is_async=True))
+    if ASYNC_DB_REPLICA_URL else None
+)
+
+# Chave: id do usuário que escreveu há menos de REPLICA_STICKY_SECONDS.
+# Vale só para o processo: com vários workers, a escrita no worker A não prende ao primário
+# o GET seguinte que cair no worker B. Nesse caso use afinidade de sessão no balanceador
+# (ou aceite leituras atrasadas por até o lag da réplica logo depois de escrever).
+recent_writers = TTLCache(maxsize=REPLICA_STICKY_MAX_USERS, ttl=REPLICA_STICKY_SECONDS)
+
+
+class ReplicaRoutingSession(OrmSession):
+    """Sessão que manda as leituras de requisições read-only para a réplica.
+
+    `info["read_only"]` é definido pela dependência da rota; qualquer escrita na sessão
+    (flush ou INSERT/UPDATE/DELETE explícito) a prende ao primário até o fim. Uma query
+    isolada vai ao primário com `execute(..., bind_arguments={"use_primary": True})`.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if reads_from_replica(self) and not self._flushing and not kwargs.get("use_primary"):
+            return async_replica_engine.sync_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(ReplicaRoutingSession, "do_orm_execute")
+def _track_explicit_writes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(ReplicaRoutingSession, "after_flush")
+def _track_flush_writes(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(ReplicaRoutingSession, "after_commit")
+def _mark_recent_writer(session):
+    if session.info.pop("wrote", False) and session.info.get("user_id") is not None:
+        recent_writers.set(session.info["user_id"], True)
+
+
+def reads_from_replica(session) -> bool:
+    # Aceita Session ou AsyncSession (info é o mesmo dicionário).
+    return bool(async_replica_engine is not None and session.info.get("read_only") and not session.info.get("wrote"))
+
+
+def bind_session_to_user(session, user_id: int):
+    # Read-your-writes: quem escreveu há pouco não pode ler da réplica atrasada.
+    session.info["user_id"] = user_id
+    if recent_writers.get(user_id):
+        session.info["read_only"] = False
+
+
+AsyncSession = async_sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+    bind=async_engine,
+    sync_session_class=ReplicaRoutingSession
+)
+
+
+async def warm_up_pool(connections: int = DB_POOL_WARMUP):
+    # Abre as conexões de uma vez e as devolve ao pool: o primeiro pico não paga o handshake.
+    engines = [async_engine] + ([async_replica_engine] if async_replica_engine is not None else [])
+    opened = await asyncio.gather(
+        *(engine.connect() for engine in engines for _ in range(connections)),
+        return_exceptions=True
+    )
+    errors = [conn for conn in opened if isinstance(conn, BaseException)]
+    for conn in opened:
+        if not isinstance(conn, BaseException):
+            await conn.close()
+    if errors:
+        raise errors[0]
+    return len(opened)
+
+
+def pool_stats():
+    return {name: monitor.stats() for name, monitor in pool_monitors.items()}
+
+
+def replica_stats():
+    return {
+        "enabled": async_replica_engine is not None,
+        "sticky_seconds": REPLICA_STICKY_SECONDS,
+        "sticky_scope": "process",
+        "recent_writers": recent_writers.stats(),
+    }
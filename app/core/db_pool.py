@@ -0,0 +1,80 @@
+from threading import Lock
+import time
+
+from decouple import config
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from .metrics import LatencyHistogram
+
+
+DB_POOL_SIZE = config("DB_POOL_SIZE", default=10, cast=int)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=20, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=30, cast=float)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", default=1800, cast=int)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", default=True, cast=bool)
+# Conexões abertas na inicialização; por padrão o pool inteiro.
+DB_POOL_WARMUP = config("DB_POOL_WARMUP", default=DB_POOL_SIZE, cast=int)
+
+
+class PoolMonitor:
+    """Tempo de espera por conexão e timeouts de checkout de um pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkout_wait = LatencyHistogram()
+        self.timeouts = 0
+        self.pool = None
+        self._lock = Lock()
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self):
+        pool = self.pool
+        with self._lock:
+            timeouts = self.timeouts
+        return {
+            "pool_size": pool.size() if pool else 0,
+            "checked_out": pool.checkedout() if pool else 0,
+            "idle": pool.checkedin() if pool else 0,
+            "overflow": pool.overflow() if pool else 0,
+            "timeouts": timeouts,
+            "checkout_wait": self.checkout_wait.snapshot(),
+        }
+
+
+class _MonitoredPoolMixin:
+    monitor: PoolMonitor
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # dispose() recria o pool pela mesma classe: o monitor passa a olhar o novo.
+        self.monitor.pool = self
+
+    def connect(self):
+        started_at = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            self.monitor.record_timeout()
+            raise
+        finally:
+            self.monitor.checkout_wait.observe((time.perf_counter() - started_at) * 1000)
+
+
+def monitored_pool_class(monitor: PoolMonitor, is_async: bool = False):
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+    return type(f"Monitored{base.__name__}", (_MonitoredPoolMixin, base), {"monitor": monitor})
+
+
+def pool_options(monitor: PoolMonitor, is_async: bool = False) -> dict:
+    return {
+        "poolclass": monitored_pool_class(monitor, is_async=is_async),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
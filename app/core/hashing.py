@@ -0,0 +1,236 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from threading import Lock
+import asyncio
+import multiprocessing
+import time
+
+from decouple import config, Csv
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from .metrics import LatencyHistogram
+
+
+# 0 desativa o pool e executa o hash na própria thread (útil para scripts e desenvolvimento).
+HASH_POOL_WORKERS = config("HASH_POOL_WORKERS", default=2, cast=int)
+HASH_POOL_MAX_PENDING = config("HASH_POOL_MAX_PENDING", default=16, cast=int)
+HASH_POOL_TIMEOUT = config("HASH_POOL_TIMEOUT", default=10, cast=float)
+# Pool separado para lotes (importação de usuários): login/registro nunca esperam atrás dele.
+# Os processos ainda disputam CPU com o pool principal, por isso o padrão é um só.
+HASH_BULK_POOL_WORKERS = config("HASH_BULK_POOL_WORKERS", default=1, cast=int)
+# Senhas por tarefa enviada ao pool de lote.
+HASH_BULK_CHUNK_SIZE = config("HASH_BULK_CHUNK_SIZE", default=64, cast=int)
+
+# O primeiro esquema é usado para novos hashes; os demais só são aceitos na verificação
+# e marcados para rehash no próximo login.
+PASSWORD_HASH_SCHEMES = config("PASSWORD_HASH_SCHEMES", default="sha256_crypt", cast=Csv())
+# 0 mantém o custo padrão do passlib para o esquema.
+PASSWORD_HASH_ROUNDS = config("PASSWORD_HASH_ROUNDS", default=0, cast=int)
+
+
+def build_crypt_context(schemes: list[str] | None = None, rounds: int | None = None) -> CryptContext:
+    schemes = list(schemes or PASSWORD_HASH_SCHEMES)
+    rounds = PASSWORD_HASH_ROUNDS if rounds is None else rounds
+
+    settings = {}
+    if rounds:
+        # min/max iguais ao padrão: qualquer hash fora da política atual precisa de rehash.
+        default_scheme = schemes[0]
+        settings[f"{default_scheme}__default_rounds"] = rounds
+        settings[f"{default_scheme}__min_rounds"] = rounds
+        settings[f"{default_scheme}__max_rounds"] = rounds
+
+    return CryptContext(schemes=schemes, deprecated="auto", **settings)
+
+
+crypt_context = build_crypt_context()
+
+
+def _hash(password: str) -> str:
+    return crypt_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> tuple[bool, str | None]:
+    return crypt_context.verify_and_update(password, hashed)
+
+
+def _apply_to_chunk(fn, items: list) -> list:
+    return [fn(item) for item in items]
+
+
+class HashingPool:
+    """Pool de processos dedicado ao hash de senhas, com limite de fila.
+
+    Quando há mais chamadas pendentes do que `max_pending`, a requisição é
+    rejeitada com 503 em vez de ocupar mais uma thread do FastAPI esperando.
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = Lock()
+        self.pending = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.latency = {
+            "hash": LatencyHistogram(),
+            "verify": LatencyHistogram(),
+            "bulk_hash": LatencyHistogram(buckets_ms=(100, 1000, 5000, 10000, 30000, 60000, 300000)),
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _acquire(self):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Serviço de autenticação sobrecarregado, tente novamente",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += 1
+
+    def _overloaded(self):
+        with self._lock:
+            self.timeouts += 1
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serviço de autenticação sobrecarregado, tente novamente",
+            headers={"Retry-After": "1"},
+        )
+
+    def _release(self, operation: str, started_at: float):
+        with self._lock:
+            self.pending -= 1
+        self.latency[operation].observe((time.perf_counter() - started_at) * 1000)
+
+    def run(self, operation: str, fn, *args):
+        if self.workers <= 0:
+            started_at = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.latency[operation].observe((time.perf_counter() - started_at) * 1000)
+
+        self._acquire()
+        started_at = time.perf_counter()
+        try:
+            future = self._get_executor().submit(fn, *args)
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise self._overloaded()
+        finally:
+            self._release(operation, started_at)
+
+    async def arun(self, operation: str, fn, *args):
+        if self.workers <= 0:
+            started_at = time.perf_counter()
+            try:
+                return await asyncio.to_thread(fn, *args)
+            finally:
+                self.latency[operation].observe((time.perf_counter() - started_at) * 1000)
+
+        self._acquire()
+        started_at = time.perf_counter()
+        try:
+            future = self._get_executor().submit(fn, *args)
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise self._overloaded()
+        finally:
+            self._release(operation, started_at)
+
+    def map(self, operation: str, fn, items: list, chunk_size: int = HASH_BULK_CHUNK_SIZE) -> list:
+        # Chunks pequenos com no máximo `max_pending` em voo: o lote não enfileira o arquivo
+        # inteiro no executor e um shutdown não espera minutos por um chunk gigante.
+        started_at = time.perf_counter()
+        try:
+            if self.workers <= 0 or len(items) <= 1:
+                return [fn(item) for item in items]
+            executor = self._get_executor()
+            in_flight = deque()
+            results = []
+            for start in range(0, len(items), chunk_size):
+                if len(in_flight) >= max(1, self.max_pending):
+                    results.extend(in_flight.popleft().result())
+                in_flight.append(executor.submit(_apply_to_chunk, fn, items[start:start + chunk_size]))
+            while in_flight:
+                results.extend(in_flight.popleft().result())
+            return results
+        finally:
+            self.latency[operation].observe((time.perf_counter() - started_at) * 1000)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            payload = {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
+        payload["latency"] = {operation: histogram.snapshot() for operation, histogram in self.latency.items()}
+        return payload
+
+
+hashing_pool = HashingPool(
+    workers=HASH_POOL_WORKERS,
+    max_pending=HASH_POOL_MAX_PENDING,
+    timeout=HASH_POOL_TIMEOUT,
+)
+
+bulk_hashing_pool = HashingPool(
+    workers=HASH_BULK_POOL_WORKERS,
+    max_pending=max(1, HASH_BULK_POOL_WORKERS) * 2,
+    timeout=HASH_POOL_TIMEOUT,
+)
+
+
+def hash_password(password: str) -> str:
+    return hashing_pool.run("hash", _hash, password)
+
+
+def verify_and_update_password(password: str, hashed: str) -> tuple[bool, str | None]:
+    return hashing_pool.run("verify", _verify_and_update, password, hashed)
+
+
+async def ahash_password(password: str) -> str:
+    return await hashing_pool.arun("hash", _hash, password)
+
+
+async def averify_and_update_password(password: str, hashed: str) -> tuple[bool, str | None]:
+    return await hashing_pool.arun("verify", _verify_and_update, password, hashed)
+
+
+def hash_passwords(passwords: list[str], workers: int | None = None) -> list[str]:
+    """Gera os hashes de várias senhas em paralelo.
+
+    Sem `workers` usa o pool de lote da aplicação (separado do pool de login); com `workers`
+    (ex.: em scripts) sobe um pool temporário com esse número de processos.
+    """
+    if workers is None:
+        return bulk_hashing_pool.map("bulk_hash", _hash, passwords)
+
+    pool = HashingPool(workers=workers, max_pending=max(1, workers) * 2, timeout=HASH_POOL_TIMEOUT)
+    try:
+        return pool.map("bulk_hash", _hash, passwords)
+    finally:
+        pool.shutdown()
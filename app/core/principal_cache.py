@@ -0,0 +1,43 @@
+from decouple import config
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .cache import TTLCache
+from ..models import User as UserModel
+
+
+PRINCIPAL_CACHE_SIZE = config("PRINCIPAL_CACHE_SIZE", default=10000, cast=int)
+PRINCIPAL_CACHE_TTL = config("PRINCIPAL_CACHE_TTL", default=60, cast=float)
+
+# Chave: subject do token (username). Valor: id, username e type_user do usuário.
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+
+def principal_from_user(user) -> dict:
+    return {
+        "id": user.id,
+        "username": user.username,
+        "type_user": user.type_user,
+    }
+
+
+@event.listens_for(UserModel, "after_update")
+def _invalidate_updated_user(mapper, connection, target):
+    usernames = {target.username}
+    usernames.update(inspect(target).attrs.username.history.deleted or ())
+    for username in usernames:
+        principal_cache.delete(username)
+
+
+@event.listens_for(UserModel, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target):
+    principal_cache.delete(target.username)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_bulk_user_writes(orm_execute_state):
+    # UPDATE/DELETE em massa não disparam os eventos por instância.
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if any(mapper.class_ is UserModel for mapper in orm_execute_state.all_mappers):
+        principal_cache.clear()
@@ -0,0 +1,59 @@
+from collections import Counter
+from contextvars import ContextVar
+import time
+
+from decouple import config
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Requisições com mais queries que isso (ou com N+1) são logadas como warning.
+SQL_QUERY_WARN_THRESHOLD = config("SQL_QUERY_WARN_THRESHOLD", default=20, cast=int)
+# Mesma query (mesmo SQL, parâmetros diferentes) repetida esse número de vezes é tratada como N+1.
+SQL_REPEAT_WARN_THRESHOLD = config("SQL_REPEAT_WARN_THRESHOLD", default=5, cast=int)
+
+
+class RequestQueryStats:
+    """Queries executadas durante uma requisição."""
+
+    def __init__(self):
+        self.count = 0
+        self.db_ms = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.db_ms += elapsed_ms
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold: int = SQL_REPEAT_WARN_THRESHOLD):
+        return [(statement, count) for statement, count in self.shapes.most_common() if count >= threshold]
+
+    def exceeds_thresholds(self):
+        return self.count > SQL_QUERY_WARN_THRESHOLD or bool(self.repeated())
+
+
+# Propaga para o threadpool e para o greenlet do run_sync: as queries da rota caem na requisição certa.
+current_query_stats: ContextVar[RequestQueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if current_query_stats.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    started = conn.info.get("query_started_at")
+    if stats is None or not started:
+        return
+    stats.record(statement, (time.perf_counter() - started.pop()) * 1000)
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_failed_query_timer(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started_at"):
+        conn.info["query_started_at"].pop()
@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from threading import Lock
+import ipaddress
+import math
+import time
+
+from decouple import config, Csv
+from fastapi import HTTPException, Request, status
+
+
+def parse_trusted_proxies(values) -> tuple:
+    return tuple(ipaddress.ip_network(value.strip(), strict=False) for value in values if value.strip())
+
+
+# IPs/redes dos proxies reversos na frente da aplicação (ex.: "10.0.0.0/8,127.0.0.1").
+# Só conexões vindas deles têm o X-Forwarded-For considerado; vazio ignora o cabeçalho,
+# já que qualquer cliente pode forjá-lo.
+RATE_LIMIT_TRUSTED_PROXIES = parse_trusted_proxies(config("RATE_LIMIT_TRUSTED_PROXIES", default="", cast=Csv()))
+
+
+def _is_trusted(address: str, trusted_proxies) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted_proxies)
+
+
+def client_ip(request: Request, trusted_proxies=RATE_LIMIT_TRUSTED_PROXIES) -> str:
+    """IP do cliente para as chaves de rate limit.
+
+    Atrás de proxies confiáveis, percorre o X-Forwarded-For da direita para a esquerda
+    e devolve o primeiro endereço que não é de um proxy confiável: os saltos à esquerda
+    dele foram escritos pelo próprio cliente e não servem de chave.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if not trusted_proxies or not _is_trusted(peer, trusted_proxies):
+        return peer
+
+    hops = [
+        hop.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for hop in header.split(",")
+        if hop.strip()
+    ]
+    for hop in reversed(hops):
+        if not _is_trusted(hop, trusted_proxies):
+            return hop
+    return hops[0] if hops else peer
+
+
+class TokenBucketLimiter:
+    """Token bucket em memória por chave (IP, username...).
+
+    `rate_per_minute` tokens são repostos por minuto até o limite `burst`.
+    As chaves menos usadas são descartadas quando passam de `max_keys`.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int, max_keys: int = 100_000):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = Lock()
+        self.allowed = 0
+        self.throttled = 0
+
+    def hit(self, key: str) -> float:
+        """Consome um token. Retorna 0 se permitido, senão os segundos até o próximo token."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated_at) * self.rate)
+
+            if tokens >= 1:
+                retry_after = 0.0
+                tokens -= 1
+                self.allowed += 1
+            else:
+                retry_after = (1 - tokens) / self.rate if self.rate > 0 else 60.0
+                self.throttled += 1
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rate_per_minute": round(self.rate * 60, 3),
+                "burst": self.burst,
+                "keys": len(self._buckets),
+                "allowed": self.allowed,
+                "throttled": self.throttled,
+            }
+
+
+login_ip_limiter = TokenBucketLimiter(
+    rate_per_minute=config("LOGIN_RATE_PER_IP", default=30, cast=float),
+    burst=config("LOGIN_BURST_PER_IP", default=10, cast=int),
+)
+login_username_limiter = TokenBucketLimiter(
+    rate_per_minute=config("LOGIN_RATE_PER_USERNAME", default=10, cast=float),
+    burst=config("LOGIN_BURST_PER_USERNAME", default=5, cast=int),
+)
+register_ip_limiter = TokenBucketLimiter(
+    rate_per_minute=config("REGISTER_RATE_PER_IP", default=10, cast=float),
+    burst=config("REGISTER_BURST_PER_IP", default=5, cast=int),
+)
+register_username_limiter = TokenBucketLimiter(
+    rate_per_minute=config("REGISTER_RATE_PER_USERNAME", default=5, cast=float),
+    burst=config("REGISTER_BURST_PER_USERNAME", default=3, cast=int),
+)
+
+
+def enforce_rate_limits(*checks: tuple[TokenBucketLimiter, str]):
+    retry_after = max((limiter.hit(key) for limiter, key in checks), default=0.0)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Muitas tentativas, aguarde e tente novamente",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+def rate_limit_stats():
+    return {
+        "login_ip": login_ip_limiter.stats(),
+        "login_username": login_username_limiter.stats(),
+        "register_ip": register_ip_limiter.stats(),
+        "register_username": register_username_limiter.stats(),
+    }
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+from threading import Lock
+import time
+
+
+class RevocationSet:
+    """Conjunto em memória de `jti` revogados, cada um válido até a expiração do token.
+
+    Depois que o token expira a assinatura JWT já o rejeita, então a entrada pode ser descartada.
+    """
+
+    # Margem ao sincronizar incrementalmente, para cobrir transações que commitaram atrasadas.
+    SYNC_OVERLAP = timedelta(seconds=60)
+
+    def __init__(self):
+        self._entries: dict[str, float] = {}
+        self._lock = Lock()
+        self.last_synced_at: datetime | None = None
+        self.rejected = 0
+
+    def add(self, jti: str, expires_at: datetime):
+        with self._lock:
+            self._entries[jti] = expires_at.timestamp()
+
+    def load(self, rows, synced_at: datetime):
+        with self._lock:
+            for jti, expires_at in rows:
+                self._entries[jti] = expires_at.timestamp()
+            self.last_synced_at = synced_at
+        self.prune()
+
+    def sync_since(self) -> datetime | None:
+        if self.last_synced_at is None:
+            return None
+        return self.last_synced_at - self.SYNC_OVERLAP
+
+    def is_revoked(self, jti: str | None) -> bool:
+        if not jti:
+            return False
+        with self._lock:
+            expires_at = self._entries.get(jti)
+            if expires_at is None:
+                return False
+            if expires_at <= time.time():
+                del self._entries[jti]
+                return False
+            self.rejected += 1
+            return True
+
+    def prune(self):
+        now = time.time()
+        with self._lock:
+            expired = [jti for jti, expires_at in self._entries.items() if expires_at <= now]
+            for jti in expired:
+                del self._entries[jti]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "rejected": self.rejected,
+                "last_synced_at": self.last_synced_at.isoformat() if self.last_synced_at else None,
+            }
+
+
+revoked_access_tokens = RevocationSet()
@@ -0,0 +1,114 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, Thread
+import asyncio
+import logging
+
+from fastapi import HTTPException, status
+
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Executa `fn` a cada `interval` segundos em uma thread daemon."""
+
+    def __init__(self, name: str, interval: float, fn, run_on_start: bool = False):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.run_on_start = run_on_start
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    def _run(self):
+        if self.run_on_start:
+            self._run_once()
+        while not self._stop.wait(self.interval):
+            self._run_once()
+
+    def _run_once(self):
+        try:
+            self.fn()
+        except Exception:
+            logger.exception("Falha na tarefa periódica %s", self.name)
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+class BoundedExecutor:
+    """Threads dedicadas a trabalhos longos disparados por rotas (ex.: importação de usuários).
+
+    A rota aguarda o resultado sem ocupar uma thread do threadpool do FastAPI. Com
+    `max_pending` trabalhos já aceitos (rodando ou na fila), novas chamadas recebem 503.
+    """
+
+    def __init__(self, name: str, workers: int, max_pending: int):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = Lock()
+        self.pending = 0
+        self.rejected = 0
+        self.completed = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+            return self._executor
+
+    def _acquire(self):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Já existe um processamento em andamento, tente novamente mais tarde",
+                    headers={"Retry-After": "30"},
+                )
+            self.pending += 1
+
+    def _release(self):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    async def run(self, fn, *args):
+        self._acquire()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        # Libera a vaga quando o trabalho termina, não quando a rota desiste de esperar:
+        # um cliente que desconecta não abre espaço para outra importação em paralelo.
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "rejected": self.rejected,
+                "completed": self.completed,
+            }
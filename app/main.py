@@ -1,12 +1,54 @@
+from contextlib import asynccontextmanager
+import logging
+
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 
-from .utils import get_current_user
+from .utils import get_current_user, require_professor
+from .utils.middleware import sql_timing_middleware
+from .core.hashing import hashing_pool, bulk_hashing_pool
+from .core.db_connection import async_engine, async_replica_engine, warm_up_pool
+from .core.tasks import PeriodicTask
+from .utils.jobs import purge_refresh_tokens_job, sync_revoked_access_tokens_job, user_import_executor, REFRESH_TOKEN_PURGE_INTERVAL, REVOCATION_SYNC_INTERVAL
 from .routers import auth_router, course_router
 from app.routers import module_router
 from app.routers import lesson_router
+from app.routers import stats_router
+
+logger = logging.getLogger(__name__)
+
+background_tasks = [
+    PeriodicTask("refresh-token-purge", REFRESH_TOKEN_PURGE_INTERVAL, purge_refresh_tokens_job),
+    PeriodicTask("revoked-token-sync", REVOCATION_SYNC_INTERVAL, sync_revoked_access_tokens_job),
+]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        sync_revoked_access_tokens_job()
+    except Exception:
+        logger.exception("Não foi possível carregar os tokens revogados na inicialização")
+
+    try:
+        await warm_up_pool()
+    except Exception:
+        logger.exception("Não foi possível pré-abrir as conexões do pool")
+
+    for task in background_tasks:
+        task.start()
+    yield
+    for task in background_tasks:
+        task.stop()
+    user_import_executor.shutdown()
+    hashing_pool.shutdown()
+    bulk_hashing_pool.shutdown()
+    await async_engine.dispose()
+    if async_replica_engine is not None:
+        await async_replica_engine.dispose()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,7 +56,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag"],
 )
+app.middleware("http")(sql_timing_middleware)
 
 @app.get("/")
 def home():
@@ -27,4 +71,6 @@ app.include_router(auth_router, tags=["auth"])
 app.include_router(course_router, tags=["courses"], dependencies=[Depends(get_current_user)])
 app.include_router(module_router, tags=["modules"], dependencies=[Depends(get_current_user)])
 app.include_router(lesson_router, tags=["lessons"], dependencies=[Depends(get_current_user)])
+# Internos de pools, caches e réplica: só professores (não há papel de administrador).
+app.include_router(stats_router, tags=["stats"], dependencies=[Depends(require_professor)])
 
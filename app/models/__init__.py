@@ -1 +1 @@
-from .models import Base, User, Course, Module, CourseEnrollment, Lesson, LessonVideo, LessonQuiz, QuizQuestion, QuizOption, ModuleCompletion, LessonCompletion, QuizAnswer, QuizAttempt, RefreshToken
\ No newline at end of file
+from .models import Base, User, Course, Module, CourseEnrollment, Lesson, LessonVideo, LessonQuiz, QuizQuestion, QuizOption, ModuleCompletion, LessonCompletion, QuizAnswer, QuizAttempt, QuizQuestionStats, RefreshToken, RevokedAccessToken
\ No newline at end of file
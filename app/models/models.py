@@ -1,5 +1,7 @@
 from .base import Base
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date, CheckConstraint, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date, CheckConstraint, Boolean, DateTime, LargeBinary, UniqueConstraint, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime, timezone
 
 from .enum import TipoUsuario
@@ -29,12 +31,32 @@ class Course(Base):
     level = Column('level', String)
     cover_image_url = Column('cover_image_url', String)
     status = Column('status', String, nullable=False, default='rascunho')
-    professor_id = Column('professor_id', Integer, ForeignKey('users.id'))
+    professor_id = Column('professor_id', Integer, ForeignKey('users.id'), index=True)
     created_at = Column('created_at', DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
     updated_at = Column('updated_at', DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    # Incrementada a cada escrita em módulos/aulas do curso; compõe o ETag do outline.
+    content_version = Column('content_version', Integer, nullable=False, default=0, server_default='0')
+    # Contadores desnormalizados do progresso: mantidos na mesma transação das escritas
+    # (LessonUseCases.create / UserUseCases.complete_lesson) e reconciliados por script.
+    lesson_count = Column('lesson_count', Integer, nullable=False, default=0, server_default='0')
+    # Mantida pelo Postgres: título pesa mais que a descrição no ranking da busca.
+    # Deferred: só é usada em WHERE/ORDER BY, nunca precisa vir no SELECT.
+    search_vector = deferred(Column('search_vector', TSVECTOR, Computed(
+        "setweight(to_tsvector('portuguese', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('portuguese', coalesce(description, '')), 'B')",
+        persisted=True
+    )))
+
+    # Somente leitura: as escritas continuam pelas colunas de FK.
+    professor = relationship('User', viewonly=True)
+    modules = relationship('Module', order_by='(Module.order_index, Module.id)', viewonly=True)
 
     __table_args__ = (
         CheckConstraint("status IN ('rascunho', 'publicado')", name='chk_course_status_values'),
+        Index('ix_courses_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('ix_courses_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+        # Ordem do catálogo e chave da paginação por cursor.
+        Index('ix_courses_created_at_id', created_at.desc(), id.desc()),
     )
 
 
@@ -42,25 +64,39 @@ class Module(Base):
     __tablename__ = 'modules'
     id = Column('id', Integer, autoincrement=True, primary_key=True)
     title = Column('title', String, nullable=False)
-    course_id = Column('course_id', Integer, ForeignKey('courses.id'))
+    course_id = Column('course_id', Integer, ForeignKey('courses.id'), index=True)
     order_index = Column('order_index', Integer, nullable=False, default=0)
 
+    lessons = relationship('Lesson', order_by='Lesson.id', viewonly=True)
+
 class CourseEnrollment(Base):
     __tablename__ = 'course_enrollments'
     id = Column('id', Integer, autoincrement=True, primary_key=True)
     registration_date = Column('registration_date', Date)
     user_id = Column('user_id', Integer, ForeignKey('users.id'))
-    course_id = Column('course_id', Integer, ForeignKey('courses.id'))
+    course_id = Column('course_id', Integer, ForeignKey('courses.id'), index=True)
+    # Aulas do curso concluídas pelo aluno; ver Course.lesson_count.
+    completed_lessons = Column('completed_lessons', Integer, nullable=False, default=0, server_default='0')
+    # Bit N ligado = aula com Lesson.course_ordinal N concluída (set_bit do Postgres: bit 0 é o
+    # menos significativo do primeiro byte). Espelha lesson_completions, que continua sendo a origem.
+    completed_bitmap = Column('completed_bitmap', LargeBinary)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'course_id', name='uq_course_enrollments_user_id_course_id'),
+    )
 
 class Lesson(Base):
     __tablename__ = 'lessons'
     id = Column('id', Integer, autoincrement=True, primary_key=True)
     title = Column('title', String, nullable=False)
     content_type = Column('content_type', String)
-    module_id = Column('module_id', Integer, ForeignKey('modules.id'))
+    module_id = Column('module_id', Integer, ForeignKey('modules.id'), index=True)
+    # Posição da aula dentro do curso (0, 1, 2...): índice do bit em CourseEnrollment.completed_bitmap.
+    course_ordinal = Column('course_ordinal', Integer)
 
     __table_args__ = (
         CheckConstraint("content_type IN ('V', 'Q')", name='chk_content_type_values'),
+        Index('ix_lessons_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
     )
     
 class LessonVideo(Base):
@@ -69,21 +105,27 @@ class LessonVideo(Base):
     lesson_id = Column('lesson_id', Integer, ForeignKey('lessons.id'))
     video_url = Column('video_url', String, nullable=False)
 
+    __table_args__ = (
+        # Vídeo mais recente da aula (WHERE lesson_id = ? ORDER BY id DESC LIMIT 1) sai do índice,
+        # sem o planner cair numa varredura da PK filtrando lesson_id.
+        Index('ix_lesson_videos_lesson_id_id', 'lesson_id', 'id'),
+    )
+
 class LessonQuiz(Base):
     __tablename__ = 'lesson_quizzes'
     id = Column('id', Integer, autoincrement=True, primary_key=True)
-    lesson_id = Column('lesson_id', Integer, ForeignKey('lessons.id'))
+    lesson_id = Column('lesson_id', Integer, ForeignKey('lessons.id'), index=True)
 
 class QuizQuestion(Base):
     __tablename__ = 'quiz_questions'
     id = Column('id', Integer, autoincrement=True, primary_key=True)
-    quiz_id = Column('quiz_id', Integer, ForeignKey('lesson_quizzes.id'))
+    quiz_id = Column('quiz_id', Integer, ForeignKey('lesson_quizzes.id'), index=True)
     question_text = Column('question_text', Text, nullable=False)
 
 class QuizOption(Base):
     __tablename__ = 'quiz_options'
     id = Column('id', Integer, autoincrement=True, primary_key=True)
-    question_id = Column('question_id', Integer, ForeignKey('quiz_questions.id'))
+    question_id = Column('question_id', Integer, ForeignKey('quiz_questions.id'), index=True)
     option_text = Column('option_text', Text, nullable=False)
     is_correct = Column('is_correct', Boolean, default=False)
 
@@ -94,6 +136,10 @@ class ModuleCompletion(Base):
     module_id = Column('module_id', Integer, ForeignKey('modules.id'))
     completion_date = Column('completion_date', Date)
 
+    __table_args__ = (
+        UniqueConstraint('user_id', 'module_id', name='uq_module_completions_user_id_module_id'),
+    )
+
 class LessonCompletion(Base):
     __tablename__ = 'lesson_completions'
     id = Column('id', Integer, autoincrement=True, primary_key=True)
@@ -101,6 +147,10 @@ class LessonCompletion(Base):
     lesson_id = Column('lesson_id', Integer, ForeignKey('lessons.id'))
     completion_date = Column('completion_date', Date)
 
+    __table_args__ = (
+        UniqueConstraint('user_id', 'lesson_id', name='uq_lesson_completions_user_id_lesson_id'),
+    )
+
 class QuizAttempt(Base):
     __tablename__ = 'quiz_attempts'
     id = Column('id', Integer, autoincrement=True, primary_key=True)
@@ -109,21 +159,41 @@ class QuizAttempt(Base):
     attempt_date = Column('attempt_date', Date)
     score = Column('score', Integer)
 
+    __table_args__ = (
+        UniqueConstraint('user_id', 'quiz_id', name='uq_quiz_attempts_user_id_quiz_id'),
+    )
+
 class QuizAnswer(Base):
     __tablename__ = 'quiz_answers'
     id = Column('id', Integer, autoincrement=True, primary_key=True)
-    attempt_id = Column('attempt_id', Integer, ForeignKey('quiz_attempts.id'))
-    question_id = Column('question_id', Integer, ForeignKey('quiz_questions.id'))
+    attempt_id = Column('attempt_id', Integer, ForeignKey('quiz_attempts.id'), index=True)
+    question_id = Column('question_id', Integer, ForeignKey('quiz_questions.id'), index=True)
     selected_option_id = Column('selected_option_id', Integer, ForeignKey('quiz_options.id'))
     is_correct = Column('is_correct', Boolean, default=False)
 
 
+class QuizQuestionStats(Base):
+    # Contadores mantidos por answer_quiz na mesma transação das respostas: as métricas não leem quiz_answers.
+    __tablename__ = 'quiz_question_stats'
+    question_id = Column('question_id', Integer, ForeignKey('quiz_questions.id'), primary_key=True)
+    total_answers = Column('total_answers', Integer, nullable=False, default=0, server_default='0')
+    correct_answers = Column('correct_answers', Integer, nullable=False, default=0, server_default='0')
+
+
 class RefreshToken(Base):
     __tablename__ = 'refresh_tokens'
     id = Column('id', Integer, autoincrement=True, primary_key=True)
     user_id = Column('user_id', Integer, ForeignKey('users.id'), nullable=False)
-    token = Column('token', Text, nullable=False, unique=True)
-    expires_at = Column('expires_at', DateTime(timezone=True), nullable=False)
+    # sha256 do JWT: o token em si nunca é gravado no banco.
+    token_hash = Column('token_hash', LargeBinary(32), nullable=False, unique=True, index=True)
+    family_id = Column('family_id', String(32), nullable=False, index=True)
+    expires_at = Column('expires_at', DateTime(timezone=True), nullable=False, index=True)
     revoked = Column('revoked', Boolean, default=False, nullable=False)
     created_at = Column('created_at', DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
 
+
+class RevokedAccessToken(Base):
+    __tablename__ = 'revoked_access_tokens'
+    jti = Column('jti', String(32), primary_key=True)
+    expires_at = Column('expires_at', DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column('revoked_at', DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), index=True)
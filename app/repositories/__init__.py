@@ -1,5 +1,5 @@
-from .auth_repo import AuthUseCases
-from .course_repo import CoursesUseCases
-from .module_repo import ModuleUseCases
-from .lesson_repo import LessonUseCases   
-from .user_repo import UserUseCases
\ No newline at end of file
+from .auth_repo import AuthUseCases, AsyncAuthUseCases
+from .course_repo import CoursesUseCases, AsyncCoursesUseCases
+from .module_repo import ModuleUseCases, AsyncModuleUseCases
+from .lesson_repo import LessonUseCases, AsyncLessonUseCases
+from .user_repo import UserUseCases, AsyncUserUseCases
@@ -0,0 +1,32 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class AsyncUseCases:
+    """Versão assíncrona de uma classe de casos de uso síncrona (`use_cases_class`).
+
+    Cada método público vira uma corrotina executada via `AsyncSession.run_sync`: a lógica
+    continua sendo a da classe síncrona, mas o I/O com o banco passa pelo driver assíncrono
+    e a rota não ocupa uma thread enquanto espera o Postgres.
+    """
+
+    use_cases_class: type
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def run(self, fn):
+        return await self.db.run_sync(lambda session: fn(self.use_cases_class(session)))
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        method = getattr(self.use_cases_class, name)
+        if not callable(method):
+            raise AttributeError(name)
+
+        async def call(*args, **kwargs):
+            return await self.run(lambda use_cases: getattr(use_cases, name)(*args, **kwargs))
+
+        call.__name__ = name
+        return call
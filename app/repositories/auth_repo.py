@@ -1,20 +1,44 @@
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from fastapi import status, HTTPException
-from passlib.context import CryptContext
+from pydantic import ValidationError
 from jose import jwt, JWTError
 from decouple import config
 from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+import hashlib
+import time
 
-from ..schemas import UserLogin, User as UserSchema
-from ..models import User as UserModel, RefreshToken as RefreshTokenModel
+from ..schemas import UserLogin, User as UserSchema, Principal
+from ..models import User as UserModel, RefreshToken as RefreshTokenModel, RevokedAccessToken as RevokedAccessTokenModel
+from ..core.principal_cache import principal_cache, principal_from_user
+from ..core.hashing import (
+    hash_password,
+    hash_passwords,
+    verify_and_update_password,
+    ahash_password,
+    averify_and_update_password,
+)
+from ..core.revocation import revoked_access_tokens
+from .async_repo import AsyncUseCases
 
 
 SECRET_KEY = config("SECRET_KEY")
 ALGORITHM = config("ALGORITHM")
-crypt_context = CryptContext(schemes=['sha256_crypt'])
 ACCESS_TOKEN_MINUTES = 30
 REFRESH_TOKEN_DAYS = 7
+# Tokens expirados há mais que isso são removidos pela limpeza periódica. Revogados não têm
+# corte próprio: a linha precisa existir até o JWT expirar para a detecção de reuso funcionar.
+REFRESH_TOKEN_RETENTION_HOURS = config("REFRESH_TOKEN_RETENTION_HOURS", default=24, cast=float)
+REFRESH_TOKEN_PURGE_BATCH_SIZE = config("REFRESH_TOKEN_PURGE_BATCH_SIZE", default=1000, cast=int)
+USER_IMPORT_BATCH_SIZE = config("USER_IMPORT_BATCH_SIZE", default=1000, cast=int)
+
+
+def hash_refresh_token(refresh_token: str) -> bytes:
+    return hashlib.sha256(refresh_token.encode("utf-8")).digest()
+
 
 class AuthUseCases:
     
@@ -22,11 +46,22 @@ class AuthUseCases:
         self.db = db_session
 
     def register(self, user: UserSchema):
+        try:
+            password_hash = hash_password(user.password)
+        except HTTPException:
+            raise
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="dados inválido"
+            )
+        self._create_user(user, password_hash)
+
+    def _create_user(self, user: UserSchema, password_hash: str):
         try:
             user_data = user.__dict__.copy()
-            user_data['password'] = crypt_context.hash(user_data['password'])
+            user_data['password'] = password_hash
             user_db = UserModel(**user_data)
-
         except Exception:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -42,10 +77,115 @@ class AuthUseCases:
                 detail="Erro ao salvar dados"
             )
 
-    def _generate_access_token(self, username: str):
+    def bulk_register(
+        self,
+        records: list[tuple[int, dict]],
+        errors: list[dict] | None = None,
+        batch_size: int = USER_IMPORT_BATCH_SIZE,
+        workers: int | None = None,
+        allow_professors: bool = False
+    ):
+        errors = list(errors or [])
+        unreadable_rows = len(errors)
+        valid: list[tuple[int, UserSchema]] = []
+        seen_usernames: set[str] = set()
+
+        for row, record in records:
+            username = record.get("username")
+            try:
+                user = UserSchema(**record)
+            except HTTPException as e:
+                errors.append({"row": row, "username": username, "error": e.detail})
+                continue
+            except ValidationError as e:
+                first_error = e.errors()[0]
+                field = ".".join(str(part) for part in first_error["loc"])
+                errors.append({"row": row, "username": username, "error": f"{field}: {first_error['msg']}"})
+                continue
+
+            # Pela API qualquer professor importa: contas de professor só pelo script (acesso ao banco).
+            if user.type_user == "P" and not allow_professors:
+                errors.append({"row": row, "username": user.username, "error": "Importação não pode criar professores"})
+                continue
+
+            if user.username in seen_usernames:
+                errors.append({"row": row, "username": user.username, "error": "Usuário repetido no arquivo"})
+                continue
+            seen_usernames.add(user.username)
+            valid.append((row, user))
+
+        # Descarta usuários já existentes antes de gastar CPU com hash.
+        existing_usernames: set[str] = set()
+        usernames = [user.username for _, user in valid]
+        for start in range(0, len(usernames), batch_size):
+            existing_usernames.update(
+                self.db.execute(
+                    select(UserModel.username).where(UserModel.username.in_(usernames[start:start + batch_size]))
+                ).scalars()
+            )
+
+        pending = []
+        for row, user in valid:
+            if user.username in existing_usernames:
+                errors.append({"row": row, "username": user.username, "error": "Usuário já existe"})
+            else:
+                pending.append((row, user))
+
+        hashed_passwords = hash_passwords([user.password for _, user in pending], workers=workers)
+
+        created = 0
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            rows = [
+                {**user.__dict__, "password": hashed_password}
+                for (_, user), hashed_password in zip(chunk, hashed_passwords[start:start + batch_size])
+            ]
+            failed_usernames: set[str] = set()
+            try:
+                inserted = self._insert_users(rows)
+            except SQLAlchemyError:
+                self.db.rollback()
+                # Alguma linha violou uma constraint: refaz o lote linha a linha para isolar o erro.
+                inserted = set()
+                for (row, user), data in zip(chunk, rows):
+                    try:
+                        inserted |= self._insert_users([data])
+                    except SQLAlchemyError as e:
+                        self.db.rollback()
+                        failed_usernames.add(user.username)
+                        errors.append({"row": row, "username": user.username, "error": "Erro ao salvar: " + str(getattr(e, "orig", e)).strip()})
+
+            created += len(inserted)
+            for row, user in chunk:
+                if user.username not in inserted and user.username not in failed_usernames:
+                    errors.append({"row": row, "username": user.username, "error": "Usuário já existe"})
+
+        return {
+            "received": len(records) + unreadable_rows,
+            "created": created,
+            "failed": len(errors),
+            "errors": sorted(errors, key=lambda item: item["row"]),
+        }
+
+    def _insert_users(self, rows: list[dict]) -> set[str]:
+        inserted = set(
+            self.db.execute(
+                pg_insert(UserModel)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=[UserModel.username])
+                .returning(UserModel.username)
+            ).scalars()
+        )
+        self.db.commit()
+        return inserted
+
+    def _generate_access_token(self, user: UserModel):
         exp = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_MINUTES)
         payload = {
-            "sub": username,
+            "sub": user.username,
+            "uid": user.id,
+            "role": user.type_user,
+            "jti": uuid4().hex,
             "exp": exp
         }
         access_token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
@@ -56,45 +196,75 @@ class AuthUseCases:
         payload = {
             "sub": username,
             "exp": exp,
+            "jti": uuid4().hex,
             "token_type": "refresh"
         }
         refresh_token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
         return refresh_token, exp
+
+    def _issue_refresh_token(self, user, family_id: str | None = None):
+        refresh_token, refresh_exp = self._generate_refresh_token(user.username)
+        refresh_token_db = RefreshTokenModel(
+            user_id=user.id,
+            token_hash=hash_refresh_token(refresh_token),
+            family_id=family_id or uuid4().hex,
+            expires_at=refresh_exp,
+            revoked=False
+        )
+        self.db.add(refresh_token_db)
+        return refresh_token
         
     def login(self, user: UserLogin):
-        user_db = self.db.query(UserModel).filter_by(username=user.username).first()
+        user_id, password_hash = self._get_login_credentials(user.username)
+        password_ok, new_password_hash = verify_and_update_password(user.password, password_hash)
+        return self._complete_login(user_id, password_ok, new_password_hash)
 
-        if user_db is None:
+    def _get_login_credentials(self, username: str) -> tuple[int, str]:
+        # Só colunas, sem objeto ORM: nada na sessão depende desta transação depois do SELECT.
+        credentials = self.db.execute(
+            select(UserModel.id, UserModel.password).where(UserModel.username == username)
+        ).first()
+
+        if credentials is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail='Login inválido!'
             )
-        
-        if not crypt_context.verify(user.password, user_db.password):
+        return credentials.id, credentials.password
+
+    def _complete_login(self, user_id: int, password_ok: bool, new_password_hash: str | None):
+        if not password_ok:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail='Login inválido!'
             )
 
-        access_token = self._generate_access_token(user.username)
-        refresh_token, refresh_exp = self._generate_refresh_token(user.username)
+        user_db = self.db.get(UserModel, user_id)
+        if user_db is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='Login inválido!'
+            )
 
-        refresh_token_db = RefreshTokenModel(
-            user_id=user_db.id,
-            token=refresh_token,
-            expires_at=refresh_exp,
-            revoked=False
-        )
-        self.db.add(refresh_token_db)
+        # Política de hash mudou desde que a senha foi salva: regrava com o custo atual.
+        if new_password_hash:
+            user_db.password = new_password_hash
+
+        access_token = self._generate_access_token(user_db)
+        refresh_token = self._issue_refresh_token(user_db)
+        # Lido antes do commit: depois dele o objeto expira e cada atributo voltaria ao banco.
+        principal = principal_from_user(user_db)
         self.db.commit()
+        # A primeira requisição autenticada já acha o principal, sem ir ao banco.
+        principal_cache.set(principal["username"], principal)
 
         return {
             "access_token": access_token,
             "refresh_token": refresh_token,
             "token_type": "bearer",
-            "user_id": user_db.id,
-            "username": user_db.username,
-            "type_user": user_db.type_user
+            "user_id": principal["id"],
+            "username": principal["username"],
+            "type_user": principal["type_user"]
         }
 
     def refresh_access_token(self, refresh_token: str):
@@ -112,71 +282,215 @@ class AuthUseCases:
                 detail='Tipo de token inválido'
             )
 
-        username = data.get("sub")
-        user_on_db = self.db.query(UserModel).filter_by(username=username).first()
-        if user_on_db is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='Refresh token inválido'
-            )
+        token_hash = hash_refresh_token(refresh_token)
 
-        token_on_db = self.db.query(RefreshTokenModel).filter_by(token=refresh_token, user_id=user_on_db.id).first()
-        if token_on_db is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='Refresh token inválido'
+        # Busca, valida e revoga o token atual em um único UPDATE ... FROM users ... RETURNING.
+        rotated = self.db.execute(
+            update(RefreshTokenModel)
+            .where(
+                RefreshTokenModel.token_hash == token_hash,
+                RefreshTokenModel.revoked.is_(False),
+                RefreshTokenModel.expires_at > datetime.now(timezone.utc),
+                RefreshTokenModel.user_id == UserModel.id,
             )
+            .values(revoked=True)
+            .returning(RefreshTokenModel.family_id, UserModel.id, UserModel.username, UserModel.type_user)
+            .execution_options(synchronize_session=False)
+        ).first()
 
-        now = datetime.now(timezone.utc)
-        expires_at = token_on_db.expires_at
-        if expires_at.tzinfo is None:
-            expires_at = expires_at.replace(tzinfo=timezone.utc)
-        if token_on_db.revoked or expires_at <= now:
+        if rotated is None:
+            self._revoke_family_on_reuse(token_hash)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail='Refresh token inválido'
             )
 
-        new_access_token = self._generate_access_token(username)
+        new_access_token = self._generate_access_token(rotated)
+        new_refresh_token = self._issue_refresh_token(rotated, family_id=rotated.family_id)
+        self.db.commit()
+        principal_cache.set(rotated.username, principal_from_user(rotated))
         return {
             "access_token": new_access_token,
+            "refresh_token": new_refresh_token,
             "token_type": "bearer"
         }
 
-    def logout(self, refresh_token: str):
-        token_on_db = self.db.query(RefreshTokenModel).filter_by(token=refresh_token).first()
-        if token_on_db is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='Refresh token inválido'
-            )
+    def _revoke_family_on_reuse(self, token_hash: bytes):
+        # Um token já rotacionado sendo reapresentado indica vazamento: derruba a família inteira.
+        reused_family = (
+            select(RefreshTokenModel.family_id)
+            .where(RefreshTokenModel.token_hash == token_hash, RefreshTokenModel.revoked.is_(True))
+            .scalar_subquery()
+        )
+        self.db.execute(
+            update(RefreshTokenModel)
+            .where(RefreshTokenModel.family_id == reused_family, RefreshTokenModel.revoked.is_(False))
+            .values(revoked=True)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
 
-        if token_on_db.revoked:
+    def logout(self, refresh_token: str, access_token: str | None = None):
+        revoked = self.db.execute(
+            update(RefreshTokenModel)
+            .where(
+                RefreshTokenModel.token_hash == hash_refresh_token(refresh_token),
+                RefreshTokenModel.revoked.is_(False),
+            )
+            .values(revoked=True)
+            .returning(RefreshTokenModel.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if revoked is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail='Refresh token inválido'
             )
 
-        token_on_db.revoked = True
-        self.db.add(token_on_db)
+        revoked_access = self._revoke_access_token(access_token) if access_token else None
         self.db.commit()
+        if revoked_access is not None:
+            revoked_access_tokens.add(revoked_access.jti, revoked_access.expires_at)
         return {"msg": "logout realizado com sucesso"}
+
+    def _revoke_access_token(self, access_token: str):
+        try:
+            data = jwt.decode(access_token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            # Token já expirado ou inválido não precisa entrar na lista de revogação.
+            return None
+        if not data.get("jti"):
+            return None
+
+        revoked_access = RevokedAccessTokenModel(
+            jti=data["jti"],
+            expires_at=datetime.fromtimestamp(data["exp"], tz=timezone.utc)
+        )
+        self.db.merge(revoked_access)
+        return revoked_access
+
+    def list_revoked_access_tokens(self, since: datetime | None = None):
+        query = self.db.query(RevokedAccessTokenModel.jti, RevokedAccessTokenModel.expires_at).filter(
+            RevokedAccessTokenModel.expires_at > datetime.now(timezone.utc)
+        )
+        if since is not None:
+            query = query.filter(RevokedAccessTokenModel.revoked_at >= since)
+        return query.all()
+
+    def purge_revoked_access_tokens(self):
+        result = self.db.execute(
+            delete(RevokedAccessTokenModel)
+            .where(RevokedAccessTokenModel.expires_at < datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount
     
     
-    def verify_token(self, token: str):
+    def purge_refresh_tokens(
+        self,
+        retention_hours: float = REFRESH_TOKEN_RETENTION_HOURS,
+        batch_size: int = REFRESH_TOKEN_PURGE_BATCH_SIZE,
+        max_batches: int | None = None
+    ):
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=retention_hours)
+        # Só tokens expirados, revogados ou não: um token rotacionado reapresentado antes de
+        # expirar ainda precisa achar a própria linha para derrubar a família (_revoke_family_on_reuse).
+        # Postgres não tem DELETE ... LIMIT: cada lote é escolhido por uma subquery limitada.
+        batch_ids = (
+            select(RefreshTokenModel.id)
+            .where(RefreshTokenModel.expires_at < cutoff)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+
+        batches = []
+        while max_batches is None or len(batches) < max_batches:
+            started_at = time.perf_counter()
+            result = self.db.execute(
+                delete(RefreshTokenModel)
+                .where(RefreshTokenModel.id.in_(batch_ids.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+            batches.append({
+                "deleted": result.rowcount,
+                "elapsed_ms": round((time.perf_counter() - started_at) * 1000, 3),
+            })
+            if result.rowcount < batch_size:
+                break
+
+        return {
+            "cutoff": cutoff.isoformat(),
+            "deleted": sum(batch["deleted"] for batch in batches),
+            "batches": batches,
+        }
+
+    def verify_token(self, token: str) -> Principal:
         try:
             data = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            user_on_db = self.db.query(UserModel).filter_by(username=data['sub']).first()
+            if revoked_access_tokens.is_revoked(data.get('jti')):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail='Token revogado'
+                )
 
-            if user_on_db is None:
+            principal = principal_cache.get(data['sub'])
+            if principal is None:
+                query = select(UserModel.id, UserModel.username, UserModel.type_user)
+                if data.get('uid') is not None:
+                    query = query.where(UserModel.id == data['uid'])
+                else:
+                    query = query.where(UserModel.username == data['sub'])
+                # Sempre no primário: a sessão ainda não sabe quem é o usuário, e uma conta recém-criada
+                # pode não ter chegado à réplica (401 indevido no primeiro GET).
+                user_on_db = self.db.execute(query, bind_arguments={"use_primary": True}).first()
+
+                if user_on_db is None or user_on_db.username != data['sub']:
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail='Token inválido'
+                    )
+                principal = principal_from_user(user_on_db)
+                principal_cache.set(data['sub'], principal)
+
+            # O username pode ter sido reaproveitado por outra conta após a emissão do token.
+            if data.get('uid') is not None and data['uid'] != principal['id']:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail='Token inválido'
                 )
-            return data
+            return Principal(**principal)
         except JWTError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail='Token inválido'
             )
 
+
+class AsyncAuthUseCases(AsyncUseCases):
+    use_cases_class = AuthUseCases
+
+    # register e login calculam o hash fora do run_sync e sem transação aberta: a conexão volta
+    # ao pool enquanto a requisição espera o pool de hashing.
+    async def register(self, user: UserSchema):
+        try:
+            password_hash = await ahash_password(user.password)
+        except HTTPException:
+            raise
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="dados inválido"
+            )
+        await self.run(lambda use_cases: use_cases._create_user(user, password_hash))
+
+    async def login(self, user: UserLogin):
+        user_id, password_hash = await self.run(lambda use_cases: use_cases._get_login_credentials(user.username))
+        # O SELECT abriu uma transação: encerra antes de esperar o hash (até HASH_POOL_TIMEOUT),
+        # senão cada login em andamento segura uma conexão idle in transaction.
+        await self.db.rollback()
+        password_ok, new_password_hash = await averify_and_update_password(user.password, password_hash)
+        return await self.run(
+            lambda use_cases: use_cases._complete_login(user_id, password_ok, new_password_hash)
+        )
@@ -1,9 +1,89 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from fastapi import HTTPException, status
-from sqlalchemy import or_
-
-from ..models import Course as CourseModel, User as UserModel, Module as ModuleModel, Lesson as LessonModel, CourseEnrollment as CourseEnrollmentModel, LessonQuiz as LessonQuizModel, QuizQuestion as QuizQuestionModel, QuizAnswer as QuizAnswerModel
+from sqlalchemy import func, literal_column, tuple_, text, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
+from decouple import config
+from datetime import datetime
+import time
+import zlib
+
+from ..models import Course as CourseModel, User as UserModel, Module as ModuleModel, Lesson as LessonModel, CourseEnrollment as CourseEnrollmentModel, LessonQuiz as LessonQuizModel, QuizQuestion as QuizQuestionModel, QuizAnswer as QuizAnswerModel, QuizQuestionStats as QuizQuestionStatsModel
 from ..schemas import Course as CourseSchema
+from ..core.pagination import encode_cursor, decode_cursor
+from ..core.cache import TTLCache
+from ..core.db_connection import REPLICA_STICKY_SECONDS
+from .async_repo import AsyncUseCases
+
+
+# Mesma configuração da coluna gerada courses.search_vector.
+COURSE_SEARCH_CONFIG = literal_column("'portuguese'::regconfig")
+# Orçamento do autocomplete: acima disso a busca é cancelada e a resposta sai vazia.
+COURSE_SUGGEST_TIMEOUT_MS = config("COURSE_SUGGEST_TIMEOUT_MS", default=150, cast=int)
+# O padrão do pg_trgm (0.6) é exigente demais para erros como "pyhton" -> "python".
+COURSE_SUGGEST_MIN_SIMILARITY = config("COURSE_SUGGEST_MIN_SIMILARITY", default=0.25, cast=float)
+COURSE_SUGGEST_CACHE_SIZE = config("COURSE_SUGGEST_CACHE_SIZE", default=5000, cast=int)
+COURSE_SUGGEST_CACHE_TTL = config("COURSE_SUGGEST_CACHE_TTL", default=300, cast=float)
+
+# SQLSTATE query_canceled: o que o Postgres devolve quando o statement_timeout estoura.
+QUERY_CANCELED_SQLSTATE = "57014"
+
+CATALOG_CACHE_SIZE = config("CATALOG_CACHE_SIZE", default=1000, cast=int)
+CATALOG_CACHE_TTL = config("CATALOG_CACHE_TTL", default=30, cast=float)
+
+# Chave: (geração, termo normalizado, limite). Prefixos quentes ("pyt", "pyth"...) não voltam ao banco.
+course_suggest_cache = TTLCache(maxsize=COURSE_SUGGEST_CACHE_SIZE, ttl=COURSE_SUGGEST_CACHE_TTL)
+_suggest_generation = 0
+
+# Páginas de GET /courses/ já serializadas em JSON (bytes). Chave: (geração, parâmetros da listagem).
+catalog_cache = TTLCache(maxsize=CATALOG_CACHE_SIZE, ttl=CATALOG_CACHE_TTL)
+_catalog_generation = 0
+_catalog_invalidated_at = float("-inf")
+
+
+def catalog_cache_key(**params):
+    # A geração entra na chave: uma página calculada antes de uma escrita e gravada depois
+    # fica numa chave antiga e nunca é lida.
+    return (_catalog_generation, tuple(sorted(params.items())))
+
+
+def invalidate_suggest_cache():
+    # Títulos de cursos e de aulas aparecem nas sugestões: chamar depois de criar/renomear qualquer um.
+    global _suggest_generation
+    _suggest_generation += 1
+    course_suggest_cache.clear()
+
+
+def catalog_cache_storable(served_by_replica: bool) -> bool:
+    # Logo depois de uma escrita a réplica pode ainda não tê-la: uma página lida nela nesse
+    # intervalo ficaria na geração nova servindo o dado antigo por CATALOG_CACHE_TTL.
+    return not served_by_replica or time.monotonic() - _catalog_invalidated_at >= REPLICA_STICKY_SECONDS
+
+
+def invalidate_catalog_cache():
+    global _catalog_generation, _catalog_invalidated_at
+    _catalog_generation += 1
+    _catalog_invalidated_at = time.monotonic()
+    catalog_cache.clear()
+    invalidate_suggest_cache()
+
+def bump_course_content_version(db: Session, course_id: int, lessons_added: int = 0):
+    # Roda na mesma transação da escrita no módulo/aula: o ETag muda junto com o commit.
+    # lessons_added mantém courses.lesson_count no mesmo UPDATE.
+    values = {"content_version": CourseModel.content_version + 1}
+    if lessons_added:
+        values["lesson_count"] = CourseModel.lesson_count + lessons_added
+    db.execute(
+        update(CourseModel)
+        .where(CourseModel.id == course_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _professor_name(fullname: str | None, username: str) -> str:
+    return fullname.strip() if fullname and fullname.strip() else username
+
 
 class CoursesUseCases:
     def __init__(self, db_session: Session):
@@ -22,11 +102,7 @@ class CoursesUseCases:
             "cover_image_url": course.cover_image_url,
             "status": course.status,
             "professor_id": course.professor_id,
-            "professor_name": (
-                professor.fullname.strip()
-                if professor and professor.fullname and professor.fullname.strip()
-                else (professor.username if professor else None)
-            ),
+            "professor_name": _professor_name(professor.fullname, professor.username) if professor else None,
             "created_at": course.created_at.isoformat() if course.created_at else None,
             "updated_at": course.updated_at.isoformat() if course.updated_at else None,
         }
@@ -34,15 +110,9 @@ class CoursesUseCases:
         if not include_modules:
             return payload
 
-        modules = (
-            self.db.query(ModuleModel)
-            .filter(ModuleModel.course_id == course.id)
-            .order_by(ModuleModel.order_index.asc(), ModuleModel.id.asc())
-            .all()
-        )
+        # course.modules/module.lessons já vêm carregados por get_course_details (selectinload + joinedload).
         modules_payload = []
-        for module in modules:
-            lessons = self.db.query(LessonModel).filter(LessonModel.module_id == module.id).all()
+        for module in course.modules:
             modules_payload.append(
                 {
                     "id": module.id,
@@ -54,7 +124,7 @@ class CoursesUseCases:
                             "title": lesson.title,
                             "content_type": lesson.content_type
                         }
-                        for lesson in lessons
+                        for lesson in module.lessons
                     ]
                 }
             )
@@ -69,18 +139,18 @@ class CoursesUseCases:
         area: str | None = None,
         level: str | None = None,
         page: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        cursor: str | None = None,
+        include_total: bool = False,
+        sort: str = "recent"
     ):
         query = self.db.query(CourseModel)
 
-        if search:
-            search_term = f"%{search.strip()}%"
-            query = query.filter(
-                or_(
-                    CourseModel.title.ilike(search_term),
-                    CourseModel.description.ilike(search_term)
-                )
-            )
+        search_query = None
+        if search and search.strip():
+            # websearch_to_tsquery aceita a sintaxe de busca do usuário ("frase", -termo, OR) sem erro de parse.
+            search_query = func.websearch_to_tsquery(COURSE_SEARCH_CONFIG, search.strip())
+            query = query.filter(CourseModel.search_vector.op("@@")(search_query))
 
         if area:
             query = query.filter(CourseModel.area.ilike(area.strip()))
@@ -88,22 +158,49 @@ class CoursesUseCases:
         if level:
             query = query.filter(CourseModel.level.ilike(level.strip()))
 
-        query = query.order_by(CourseModel.created_at.desc())
-
-        total = query.count()
-
-        courses = (
-            query
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-            .all()
-        )
+        # Contar é um segundo scan do conjunto filtrado: só quando pedido.
+        total = query.count() if include_total else None
+
+        if sort == "relevance" and search_query is not None:
+            sort_key = func.ts_rank(CourseModel.search_vector, search_query)
+            parse_sort_key = float
+        else:
+            sort_key = CourseModel.created_at
+            parse_sort_key = datetime.fromisoformat
+
+        query = query.add_columns(sort_key).order_by(sort_key.desc(), CourseModel.id.desc())
+
+        if cursor:
+            # Keyset em (chave de ordenação, id): o custo da página não cresce com a profundidade.
+            last_key, last_id = decode_cursor(cursor, 2)
+            try:
+                last_key = parse_sort_key(last_key)
+                last_id = int(last_id)
+            except (TypeError, ValueError):
+                raise HTTPException(
+                    detail="Cursor inválido",
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+            query = query.filter(tuple_(sort_key, CourseModel.id) < tuple_(last_key, last_id))
+        elif page > 1:
+            query = query.offset((page - 1) * page_size)
+
+        rows = query.limit(page_size + 1).all()
+        next_cursor = None
+        if len(rows) > page_size:
+            last_course, last_key = rows[page_size - 1]
+            next_cursor = encode_cursor(
+                last_key.isoformat() if isinstance(last_key, datetime) else last_key,
+                last_course.id
+            )
+        courses = [course for course, _ in rows[:page_size]]
 
         if not courses:
             return {
                 "total": total,
                 "page": page,
                 "page_size": page_size,
+                "next_cursor": None,
                 "results": []
             }
 
@@ -120,19 +217,103 @@ class CoursesUseCases:
             "total": total,
             "page": page,
             "page_size": page_size,
+            "next_cursor": next_cursor,
             "results": results
         }
 
+    def suggest(self, term: str, limit: int = 8):
+        term = " ".join(term.lower().split())
+        # Mesma ideia da geração do catálogo: resultado calculado antes de uma escrita não é servido depois dela.
+        cache_key = (_suggest_generation, term, limit)
+        cached = course_suggest_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # word_similarity (title %> termo) tolera erro de digitação e casa prefixos; o índice GIN trigram atende os dois.
+        course_score = func.word_similarity(term, CourseModel.title)
+        lesson_score = func.word_similarity(term, LessonModel.title)
+        try:
+            self.db.execute(text(f"SET LOCAL statement_timeout = {int(COURSE_SUGGEST_TIMEOUT_MS)}"))
+            self.db.execute(text(f"SET LOCAL pg_trgm.word_similarity_threshold = {float(COURSE_SUGGEST_MIN_SIMILARITY)}"))
+            courses = (
+                self.db.query(CourseModel.id, CourseModel.title, course_score.label("score"))
+                .filter(CourseModel.title.op("%>")(term))
+                .order_by(course_score.desc(), CourseModel.id)
+                .limit(limit)
+                .all()
+            )
+            lessons = (
+                self.db.query(LessonModel.id, LessonModel.title, ModuleModel.course_id, lesson_score.label("score"))
+                .join(ModuleModel, ModuleModel.id == LessonModel.module_id)
+                .filter(LessonModel.title.op("%>")(term))
+                .order_by(lesson_score.desc(), LessonModel.id)
+                .limit(limit)
+                .all()
+            )
+        except DBAPIError as e:
+            self.db.rollback()
+            # Só o statement_timeout vira resposta vazia (melhor do que travar a digitação);
+            # conexão perdida, extensão ausente etc. continuam sendo erro.
+            # psycopg2 e o adaptador asyncpg do SQLAlchemy expõem o SQLSTATE em pgcode.
+            if getattr(e.orig, "pgcode", None) != QUERY_CANCELED_SQLSTATE:
+                raise
+            return {"query": term, "timed_out": True, "courses": [], "lessons": []}
+        finally:
+            # Encerra a transação para o SET LOCAL não valer para mais nada.
+            if self.db.in_transaction():
+                self.db.rollback()
+
+        result = {
+            "query": term,
+            "timed_out": False,
+            "courses": [
+                {"id": row.id, "title": row.title, "score": round(row.score, 4)}
+                for row in courses
+            ],
+            "lessons": [
+                {"id": row.id, "title": row.title, "course_id": row.course_id, "score": round(row.score, 4)}
+                for row in lessons
+            ],
+        }
+        course_suggest_cache.set(cache_key, result)
+        return result
+
+    def get_course_etag(self, course_id: int) -> str:
+        # Uma query barata por PK: decide o 304 sem montar o outline.
+        # O nome do professor também vai no corpo e users não tem updated_at: entra no ETag como hash.
+        version = self.db.execute(
+            select(CourseModel.updated_at, CourseModel.content_version, UserModel.fullname, UserModel.username)
+            .outerjoin(UserModel, UserModel.id == CourseModel.professor_id)
+            .where(CourseModel.id == course_id)
+        ).first()
+        if version is None:
+            raise HTTPException(
+                detail="Curso não encontrado",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        updated_at, content_version, fullname, username = version
+        professor_name = _professor_name(fullname, username) if username is not None else ""
+        professor_hash = zlib.crc32(professor_name.encode("utf-8"))
+        return f'"{course_id}-{int(updated_at.timestamp() * 1_000_000)}-{content_version}-{professor_hash:08x}"'
+
     def get_course_details(self, course_id: int):
-        course = self.db.query(CourseModel).filter(CourseModel.id == course_id).first()
+        # Duas queries no total: curso + professor (JOIN) e módulos + aulas (JOIN).
+        course = (
+            self.db.query(CourseModel)
+            .options(
+                joinedload(CourseModel.professor),
+                selectinload(CourseModel.modules).joinedload(ModuleModel.lessons)
+            )
+            .filter(CourseModel.id == course_id)
+            .first()
+        )
         if not course:
             raise HTTPException(
                 detail="Curso não encontrado",
                 status_code=status.HTTP_404_NOT_FOUND
             )
 
-        professor = self.db.query(UserModel).filter(UserModel.id == course.professor_id).first()
-        return self._serialize_course(course, professor=professor, include_modules=True)
+        return self._serialize_course(course, professor=course.professor, include_modules=True)
     
     def create_course(self, course_data: CourseSchema):
 
@@ -148,6 +329,7 @@ class CoursesUseCases:
         try:
             self.db.add(new_course)
             self.db.commit()
+            invalidate_catalog_cache()
             self.db.refresh(new_course)
             return self._serialize_course(new_course, professor=user, include_modules=False)
         except Exception as e:
@@ -183,6 +365,7 @@ class CoursesUseCases:
         try:
             self.db.add(course)
             self.db.commit()
+            invalidate_catalog_cache()
             self.db.refresh(course)
             return self._serialize_course(course, professor=professor, include_modules=False)
         except Exception:
@@ -203,41 +386,29 @@ class CoursesUseCases:
                 status_code=status.HTTP_404_NOT_FOUND
             )
 
-        courses = self.db.query(CourseModel).filter(CourseModel.professor_id == professor_id).all()
-        if not courses:
-            return {
-                "professor_id": professor_id,
-                "courses_total": 0,
-                "total_enrollments": 0,
-                "courses_by_enrollments": []
-            }
-
-        course_ids = [course.id for course in courses]
-        enrollments = self.db.query(CourseEnrollmentModel).filter(
-            CourseEnrollmentModel.course_id.in_(course_ids)
-        ).all()
-
-        enrollments_by_course: dict[int, int] = {course_id: 0 for course_id in course_ids}
-        for enrollment in enrollments:
-            enrollments_by_course[enrollment.course_id] = enrollments_by_course.get(enrollment.course_id, 0) + 1
-
-        courses_by_enrollments = sorted(
-            [
-                {
-                    "course_id": course.id,
-                    "title": course.title,
-                    "enrollments": enrollments_by_course.get(course.id, 0)
-                }
-                for course in courses
-            ],
-            key=lambda item: (-item["enrollments"], item["title"].lower())
+        # Contagem e ordenação no banco: nenhuma matrícula vira objeto em memória.
+        enrollments_count = func.count(CourseEnrollmentModel.id).label("enrollments")
+        rows = (
+            self.db.query(CourseModel.id, CourseModel.title, enrollments_count)
+            .outerjoin(CourseEnrollmentModel, CourseEnrollmentModel.course_id == CourseModel.id)
+            .filter(CourseModel.professor_id == professor_id)
+            .group_by(CourseModel.id, CourseModel.title)
+            .order_by(enrollments_count.desc(), func.lower(CourseModel.title))
+            .all()
         )
 
         return {
             "professor_id": professor_id,
-            "courses_total": len(courses),
-            "total_enrollments": len(enrollments),
-            "courses_by_enrollments": courses_by_enrollments
+            "courses_total": len(rows),
+            "total_enrollments": sum(row.enrollments for row in rows),
+            "courses_by_enrollments": [
+                {
+                    "course_id": row.id,
+                    "title": row.title,
+                    "enrollments": row.enrollments
+                }
+                for row in rows
+            ]
         }
 
     def get_course_quiz_question_metrics(self, course_id: int, professor_id: int):
@@ -254,111 +425,95 @@ class CoursesUseCases:
                 status_code=status.HTTP_403_FORBIDDEN
             )
 
-        modules = self.db.query(ModuleModel).filter(ModuleModel.course_id == course_id).all()
-        if not modules:
-            return {
-                "course_id": course_id,
-                "questions_total": 0,
-                "answers_total": 0,
-                "correct_answers_total": 0,
-                "questions": []
-            }
-
-        module_by_id = {module.id: module for module in modules}
-        module_ids = list(module_by_id.keys())
-
-        lessons = self.db.query(LessonModel).filter(LessonModel.module_id.in_(module_ids)).all()
-        if not lessons:
-            return {
-                "course_id": course_id,
-                "questions_total": 0,
-                "answers_total": 0,
-                "correct_answers_total": 0,
-                "questions": []
-            }
-
-        lesson_by_id = {lesson.id: lesson for lesson in lessons}
-        lesson_ids = list(lesson_by_id.keys())
-
-        quizzes = self.db.query(LessonQuizModel).filter(LessonQuizModel.lesson_id.in_(lesson_ids)).all()
-        if not quizzes:
-            return {
-                "course_id": course_id,
-                "questions_total": 0,
-                "answers_total": 0,
-                "correct_answers_total": 0,
-                "questions": []
-            }
-
-        quiz_by_id = {quiz.id: quiz for quiz in quizzes}
-        quiz_ids = list(quiz_by_id.keys())
-
-        questions = self.db.query(QuizQuestionModel).filter(QuizQuestionModel.quiz_id.in_(quiz_ids)).all()
-        if not questions:
-            return {
-                "course_id": course_id,
-                "questions_total": 0,
-                "answers_total": 0,
-                "correct_answers_total": 0,
-                "questions": []
-            }
+        # Um único JOIN com os contadores de quiz_question_stats: quiz_answers não é lido.
+        # Pergunta que nunca foi respondida não tem linha nos contadores e sai com zero.
+        total = func.coalesce(QuizQuestionStatsModel.total_answers, 0).label("total_answers")
+        correct = func.coalesce(QuizQuestionStatsModel.correct_answers, 0).label("correct_answers")
+        rows = (
+            self.db.query(
+                QuizQuestionModel.id,
+                QuizQuestionModel.question_text,
+                ModuleModel.id.label("module_id"),
+                ModuleModel.title.label("module_title"),
+                LessonModel.id.label("lesson_id"),
+                LessonModel.title.label("lesson_title"),
+                total,
+                correct,
+            )
+            .join(LessonQuizModel, LessonQuizModel.id == QuizQuestionModel.quiz_id)
+            .join(LessonModel, LessonModel.id == LessonQuizModel.lesson_id)
+            .join(ModuleModel, ModuleModel.id == LessonModel.module_id)
+            .outerjoin(QuizQuestionStatsModel, QuizQuestionStatsModel.question_id == QuizQuestionModel.id)
+            .filter(ModuleModel.course_id == course_id)
+            .order_by(ModuleModel.order_index, LessonModel.id, QuizQuestionModel.id)
+            .all()
+        )
 
-        question_ids = [question.id for question in questions]
-        answers = self.db.query(QuizAnswerModel).filter(QuizAnswerModel.question_id.in_(question_ids)).all()
-
-        answers_by_question: dict[int, dict[str, int]] = {}
-        for answer in answers:
-            stats = answers_by_question.setdefault(answer.question_id, {"total": 0, "correct": 0})
-            stats["total"] += 1
-            if answer.is_correct:
-                stats["correct"] += 1
-
-        questions_payload = []
-        total_answers = 0
-        total_correct_answers = 0
-
-        for question in questions:
-            stats = answers_by_question.get(question.id, {"total": 0, "correct": 0})
-            total = stats["total"]
-            correct = stats["correct"]
-            total_answers += total
-            total_correct_answers += correct
-            accuracy = round((correct / total) * 100, 2) if total > 0 else 0.0
-
-            quiz = quiz_by_id.get(question.quiz_id)
-            lesson = lesson_by_id.get(quiz.lesson_id) if quiz else None
-            module = module_by_id.get(lesson.module_id) if lesson else None
-
-            questions_payload.append(
+        return {
+            "course_id": course_id,
+            "questions_total": len(rows),
+            "answers_total": sum(row.total_answers for row in rows),
+            "correct_answers_total": sum(row.correct_answers for row in rows),
+            "questions": [
                 {
-                    "question_id": question.id,
-                    "question_text": question.question_text,
-                    "module_id": module.id if module else None,
-                    "module_title": module.title if module else None,
-                    "lesson_id": lesson.id if lesson else None,
-                    "lesson_title": lesson.title if lesson else None,
-                    "total_answers": total,
-                    "correct_answers": correct,
-                    "accuracy_percent": accuracy,
-                    "order_index": module.order_index if module else 9999,
+                    "question_id": row.id,
+                    "question_text": row.question_text,
+                    "module_id": row.module_id,
+                    "module_title": row.module_title,
+                    "lesson_id": row.lesson_id,
+                    "lesson_title": row.lesson_title,
+                    "total_answers": row.total_answers,
+                    "correct_answers": row.correct_answers,
+                    "accuracy_percent": round((row.correct_answers / row.total_answers) * 100, 2) if row.total_answers > 0 else 0.0,
                 }
-            )
+                for row in rows
+            ]
+        }
 
-        questions_payload = sorted(
-            questions_payload,
-            key=lambda item: (
-                item["order_index"],
-                item["lesson_id"] or 0,
-                item["question_id"]
+    def rebuild_quiz_question_stats(self) -> int:
+        # Recalcula os contadores a partir de quiz_answers; rodar de novo dá o mesmo resultado.
+        # O LOCK segura os answer_quiz concorrentes até o commit: respostas já gravadas entram
+        # na contagem e as que estavam em andamento incrementam por cima do recálculo.
+        try:
+            self.db.execute(text("LOCK TABLE quiz_question_stats IN EXCLUSIVE MODE"))
+            counts = (
+                select(
+                    QuizAnswerModel.question_id,
+                    func.count().label("total_answers"),
+                    func.count().filter(QuizAnswerModel.is_correct.is_(True)).label("correct_answers"),
+                )
+                .where(QuizAnswerModel.question_id.is_not(None))
+                .group_by(QuizAnswerModel.question_id)
             )
-        )
-        for item in questions_payload:
-            del item["order_index"]
+            upsert = pg_insert(QuizQuestionStatsModel).from_select(
+                ["question_id", "total_answers", "correct_answers"], counts
+            )
+            result = self.db.execute(
+                upsert.on_conflict_do_update(
+                    index_elements=[QuizQuestionStatsModel.question_id],
+                    set_={
+                        "total_answers": upsert.excluded.total_answers,
+                        "correct_answers": upsert.excluded.correct_answers,
+                    }
+                )
+            )
+            # Perguntas que ficaram sem nenhuma resposta não aparecem na contagem acima: zera.
+            emptied = self.db.execute(
+                update(QuizQuestionStatsModel)
+                .where(
+                    ~select(QuizAnswerModel.id)
+                    .where(QuizAnswerModel.question_id == QuizQuestionStatsModel.question_id)
+                    .exists(),
+                    (QuizQuestionStatsModel.total_answers != 0) | (QuizQuestionStatsModel.correct_answers != 0),
+                )
+                .values(total_answers=0, correct_answers=0)
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+            return result.rowcount + emptied.rowcount
+        except Exception:
+            self.db.rollback()
+            raise
 
-        return {
-            "course_id": course_id,
-            "questions_total": len(questions_payload),
-            "answers_total": total_answers,
-            "correct_answers_total": total_correct_answers,
-            "questions": questions_payload
-        }
\ No newline at end of file
+class AsyncCoursesUseCases(AsyncUseCases):
+    use_cases_class = CoursesUseCases
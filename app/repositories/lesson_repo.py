@@ -1,8 +1,11 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
-from ..models import Lesson as LessonModel, Module as ModuleModel, Course as CourseModel, User as UserModel, LessonVideo as LessonVideoModel, LessonQuiz as LessonQuizModel, QuizQuestion as QuizQuestionModel, QuizOption as QuizOptionModel
-from ..schemas import Lesson as LessonSchema, LessonVideo as LessonVideoSchema, LessonQuiz as LessonQuizSchema, QuizQuestion as QuizQuestionSchema
+from ..models import Lesson as LessonModel, Module as ModuleModel, Course as CourseModel, LessonVideo as LessonVideoModel, LessonQuiz as LessonQuizModel, QuizQuestion as QuizQuestionModel, QuizOption as QuizOptionModel
+from ..schemas import Lesson as LessonSchema, LessonVideo as LessonVideoSchema, LessonQuiz as LessonQuizSchema, QuizQuestion as QuizQuestionSchema, Principal
+from .async_repo import AsyncUseCases
+from .course_repo import bump_course_content_version, invalidate_suggest_cache
 
 
 class LessonUseCases:
@@ -39,8 +42,7 @@ class LessonUseCases:
             for lesson in lessons
         ]
 
-    def _require_course_owner_from_module(self, module_id: int, username: str):
-        user_id = self.db.query(UserModel.id).filter(UserModel.username == username).scalar()
+    def _require_course_owner_from_module(self, module_id: int, principal: Principal):
         module = self.db.query(ModuleModel).filter(ModuleModel.id == module_id).first()
         if not module:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Módulo não encontrado")
@@ -49,25 +51,39 @@ class LessonUseCases:
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Curso não encontrado")
 
-        if course.professor_id != user_id:
+        if course.professor_id != principal.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Apenas o professor do curso pode criar aulas"
             )
         return module, course
 
-    def _require_course_owner_from_lesson(self, lesson_id: int, username: str):
+    def _require_course_owner_from_lesson(self, lesson_id: int, principal: Principal):
         lesson = self.db.query(LessonModel).filter(LessonModel.id == lesson_id).first()
         if not lesson:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Aula não encontrada")
 
-        module, course = self._require_course_owner_from_module(lesson.module_id, username)
+        module, course = self._require_course_owner_from_module(lesson.module_id, principal)
         return lesson, module, course
 
-    def create(self, data: LessonSchema, username: str):
+    def create(self, data: LessonSchema, principal: Principal):
         try:
-            self._require_course_owner_from_module(data.module_id, username)
-            lesson = LessonModel(title=data.title, content_type=data.content_type, module_id=data.module_id)
+            _, course = self._require_course_owner_from_module(data.module_id, principal)
+            # O UPDATE em courses trava a linha do curso até o commit: aulas criadas ao mesmo
+            # tempo no curso recebem posições (course_ordinal) distintas.
+            bump_course_content_version(self.db, course.id, lessons_added=1)
+            course_ordinal = (
+                self.db.query(func.coalesce(func.max(LessonModel.course_ordinal) + 1, 0))
+                .join(ModuleModel, ModuleModel.id == LessonModel.module_id)
+                .filter(ModuleModel.course_id == course.id)
+                .scalar()
+            )
+            lesson = LessonModel(
+                title=data.title,
+                content_type=data.content_type,
+                module_id=data.module_id,
+                course_ordinal=course_ordinal
+            )
             self.db.add(lesson)
             self.db.commit()
             self.db.refresh(lesson)
@@ -78,6 +94,7 @@ class LessonUseCases:
             self.db.rollback()
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Erro ao criar aula: " + str(e))
 
+        invalidate_suggest_cache()
         return lesson
     
     def get_by_id(self, lesson_id: int):
@@ -99,8 +116,8 @@ class LessonUseCases:
             "video_url": lesson_video.video_url if lesson_video else None,
         }
     
-    def create_video(self, data: LessonVideoSchema, username: str):
-        self._require_course_owner_from_lesson(data.lesson_id, username)
+    def create_video(self, data: LessonVideoSchema, principal: Principal):
+        self._require_course_owner_from_lesson(data.lesson_id, principal)
         
         try:
             lesson_video = LessonVideoModel(lesson_id=data.lesson_id, video_url=data.video_url)
@@ -112,8 +129,8 @@ class LessonUseCases:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Erro ao criar vídeo da aula: " + str(e))
         return lesson_video
     
-    def create_quiz(self, data: LessonQuizSchema, username: str):
-        self._require_course_owner_from_lesson(data.lesson_id, username)
+    def create_quiz(self, data: LessonQuizSchema, principal: Principal):
+        self._require_course_owner_from_lesson(data.lesson_id, principal)
         
         try:
             lesson_quiz = LessonQuizModel(lesson_id=data.lesson_id)
@@ -181,12 +198,10 @@ class LessonUseCases:
 
         return {"lesson_id": lesson_id, "quiz_id": quiz.id, "questions": payload_questions}
 
-    def get_quiz_with_attempt_by_lesson_id(self, lesson_id: int, username: str):
+    def get_quiz_with_attempt_by_lesson_id(self, lesson_id: int, principal: Principal):
         from ..models import QuizAttempt as QuizAttemptModel, QuizAnswer as QuizAnswerModel
 
-        user_id = self.db.query(UserModel.id).filter(UserModel.username == username).scalar()
-        if not user_id:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não existe")
+        user_id = principal.id
 
         lesson = self.db.query(LessonModel).filter(LessonModel.id == lesson_id).first()
         if not lesson:
@@ -245,11 +260,11 @@ class LessonUseCases:
             },
         }
 
-    def add_question_to_quiz(self, question: QuizQuestionSchema, username: str):
+    def add_question_to_quiz(self, question: QuizQuestionSchema, principal: Principal):
         quiz = self.db.query(LessonQuizModel).filter(LessonQuizModel.id == question.quiz_id).first()
         if not quiz:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz não encontrado")
-        self._require_course_owner_from_lesson(quiz.lesson_id, username)
+        self._require_course_owner_from_lesson(quiz.lesson_id, principal)
         
         try:
             # Validar que tenha exatamente uma opção correta
@@ -295,5 +310,6 @@ class LessonUseCases:
             })
         return result
 
-    
 
+class AsyncLessonUseCases(AsyncUseCases):
+    use_cases_class = LessonUseCases
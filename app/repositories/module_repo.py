@@ -1,8 +1,10 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from fastapi import HTTPException, status
 
-from ..models import Module as ModuleModel, User as UserModel, Course as CourseModel, Lesson as LessonModel
-from ..schemas import Module as ModuleSchema
+from ..models import Module as ModuleModel, Course as CourseModel
+from ..schemas import Module as ModuleSchema, Principal
+from .async_repo import AsyncUseCases
+from .course_repo import bump_course_content_version
 
 
 class ModuleUseCases:
@@ -14,42 +16,36 @@ class ModuleUseCases:
         return self.db.query(ModuleModel).all()
 
     def list_by_course_id(self, course_id: int):
-        course = self.db.query(CourseModel).filter(CourseModel.id == course_id).first()
+        # Duas queries: o curso e, em seguida, módulos + aulas num único JOIN.
+        course = (
+            self.db.query(CourseModel)
+            .options(selectinload(CourseModel.modules).joinedload(ModuleModel.lessons))
+            .filter(CourseModel.id == course_id)
+            .first()
+        )
         if not course:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Curso não encontrado"
             )
 
-        modules = (
-            self.db.query(ModuleModel)
-            .filter(ModuleModel.course_id == course_id)
-            .order_by(ModuleModel.order_index.asc(), ModuleModel.id.asc())
-            .all()
-        )
-        if not modules:
-            return []
-
-        payload = []
-        for module in modules:
-            lessons = self.db.query(LessonModel).filter(LessonModel.module_id == module.id).all()
-            payload.append(
-                {
-                    "id": module.id,
-                    "title": module.title,
-                    "course_id": module.course_id,
-                    "order_index": module.order_index,
-                    "lessons": [
-                        {
-                            "id": lesson.id,
-                            "title": lesson.title,
-                            "content_type": lesson.content_type
-                        }
-                        for lesson in lessons
-                    ]
-                }
-            )
-        return payload
+        return [
+            {
+                "id": module.id,
+                "title": module.title,
+                "course_id": module.course_id,
+                "order_index": module.order_index,
+                "lessons": [
+                    {
+                        "id": lesson.id,
+                        "title": lesson.title,
+                        "content_type": lesson.content_type
+                    }
+                    for lesson in module.lessons
+                ]
+            }
+            for module in course.modules
+        ]
     
     def get_by_id(self, module_id: int):
             module = self.db.query(ModuleModel).filter(ModuleModel.id == module_id).first()
@@ -57,21 +53,20 @@ class ModuleUseCases:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Módulo não encontrado")
             return module
 
-    def _require_course_owner(self, course_id: int, username: str):
-        user_id = self.db.query(UserModel.id).filter(UserModel.username == username).scalar()
+    def _require_course_owner(self, course_id: int, principal: Principal):
         course = self.db.query(CourseModel).filter(CourseModel.id == course_id).first()
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Curso não encontrado")
-        if course.professor_id != user_id:
+        if course.professor_id != principal.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Apenas o professor do curso pode criar módulos"
             )
         return course
 
-    def create(self, data: ModuleSchema, username: str):
+    def create(self, data: ModuleSchema, principal: Principal):
         try:
-            self._require_course_owner(data.course_id, username)
+            self._require_course_owner(data.course_id, principal)
             next_order = data.order_index
             if next_order is None:
                 max_order = (
@@ -88,6 +83,7 @@ class ModuleUseCases:
                 order_index=next_order
             )
             self.db.add(module)
+            bump_course_content_version(self.db, data.course_id)
             self.db.commit()
             self.db.refresh(module)
             return module
@@ -97,8 +93,7 @@ class ModuleUseCases:
         except Exception as e:
             self.db.rollback()
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Erro ao criar módulo")
-        
-
-    
 
 
+class AsyncModuleUseCases(AsyncUseCases):
+    use_cases_class = ModuleUseCases
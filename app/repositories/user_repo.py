@@ -1,63 +1,165 @@
+from sqlalchemy import func, select, text, update, type_coerce, literal_column, Integer, LargeBinary
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert, aggregate_order_by
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
+from decouple import config
 from datetime import date
 import hashlib
 
 from ..models import User as UserModel
-from ..models import CourseEnrollment as EnrollmentModel, Course as CourseModel, Module as ModuleModel, Lesson as LessonModel, ModuleCompletion as ModuleCompletionModel, LessonCompletion as LessonCompletionModel, QuizAnswer as QuizAnswerModel, QuizOption as QuizOptionModel, QuizAttempt as QuizAttemptModel, QuizQuestion as QuizQuestionModel
+from ..schemas import Principal
+from ..models import CourseEnrollment as EnrollmentModel, Course as CourseModel, Module as ModuleModel, Lesson as LessonModel, ModuleCompletion as ModuleCompletionModel, LessonCompletion as LessonCompletionModel, QuizAnswer as QuizAnswerModel, QuizOption as QuizOptionModel, QuizAttempt as QuizAttemptModel, QuizQuestion as QuizQuestionModel, QuizQuestionStats as QuizQuestionStatsModel
+from .async_repo import AsyncUseCases
+
+
+# Lê conclusões pelo bitmap de course_enrollments em vez de lesson_completions. O bitmap é
+# mantido sempre; antes de ligar, rode scripts/backfill_completion_bitmaps.py uma vez.
+LESSON_COMPLETION_BITMAP = config("LESSON_COMPLETION_BITMAP", default=False, cast=bool)
+COMPLETION_BITMAP_BATCH_SIZE = config("COMPLETION_BITMAP_BATCH_SIZE", default=1000, cast=int)
+# Cursos por transação em reconcile_progress_counters.
+PROGRESS_RECONCILE_BATCH_SIZE = config("PROGRESS_RECONCILE_BATCH_SIZE", default=100, cast=int)
+
+
+def _bitmap_from_ordinals(ordinals) -> bytes | None:
+    bits = 0
+    for ordinal in ordinals:
+        bits |= 1 << ordinal
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little") if bits else None
+
+
+def _bitmap_ordinals(bitmap: bytes | None) -> set[int]:
+    bits = int.from_bytes(bitmap or b"", "little")
+    return {ordinal for ordinal in range(bits.bit_length()) if bits >> ordinal & 1}
+
+
+def _bitmap_popcount(bitmap: bytes | None) -> int:
+    return int.from_bytes(bitmap or b"", "little").bit_count()
+
+
+def _bitmap_with_lesson(lesson_id):
+    # set_bit exige que o bit já exista: completa com bytes zerados até caber a posição da aula.
+    # Aula sem course_ordinal deixa o bitmap como está (o backfill corrige).
+    ordinal = select(LessonModel.course_ordinal).where(LessonModel.id == lesson_id).scalar_subquery()
+    current = func.coalesce(EnrollmentModel.completed_bitmap, type_coerce(b"", LargeBinary))
+    missing_bytes = func.greatest(0, ordinal // 8 + 1 - func.length(current))
+    padded = current.op("||", return_type=LargeBinary)(func.decode(func.repeat("00", missing_bytes), "hex"))
+    return func.coalesce(func.set_bit(padded, ordinal, 1, type_=LargeBinary), EnrollmentModel.completed_bitmap)
+
+
+def _course_id_of_lesson(lesson_id):
+    return (
+        select(ModuleModel.course_id)
+        .join(LessonModel, LessonModel.module_id == ModuleModel.id)
+        .where(LessonModel.id == lesson_id)
+        .scalar_subquery()
+    )
+
+
+def _completed_lessons_count(user_id, course_id):
+    # Fonte de verdade de course_enrollments.completed_lessons (aceita colunas para correlacionar).
+    return (
+        select(func.count(LessonCompletionModel.id))
+        .join(LessonModel, LessonModel.id == LessonCompletionModel.lesson_id)
+        .join(ModuleModel, ModuleModel.id == LessonModel.module_id)
+        .where(LessonCompletionModel.user_id == user_id, ModuleModel.course_id == course_id)
+        .scalar_subquery()
+    )
+
+
+def _completed_ordinals(user_id, course_id):
+    return (
+        select(LessonModel.course_ordinal.label("ordinal"))
+        .join(LessonCompletionModel, LessonCompletionModel.lesson_id == LessonModel.id)
+        .join(ModuleModel, ModuleModel.id == LessonModel.module_id)
+        .where(
+            LessonCompletionModel.user_id == user_id,
+            ModuleModel.course_id == course_id,
+            LessonModel.course_ordinal.is_not(None),
+        )
+        .subquery()
+    )
+
+
+def _completed_bitmap(user_id, course_id):
+    # Mesmo resultado de _bitmap_from_ordinals, calculado no Postgres: um byte (em hex) por grupo
+    # de 8 ordinais, com os grupos sem conclusão preenchidos com 00. Sem conclusões: NULL.
+    completed = _completed_ordinals(user_id, course_id)
+    byte_index = completed.c.ordinal // 8
+    byte_values = (
+        select(
+            byte_index.label("byte_index"),
+            func.bit_or(literal_column("1", Integer).op("<<")(completed.c.ordinal % 8)).label("value"),
+        )
+        .group_by(byte_index)
+        .subquery()
+    )
+    last_byte = select(func.max(_completed_ordinals(user_id, course_id).c.ordinal) // 8).scalar_subquery()
+    all_bytes = func.generate_series(0, last_byte).table_valued("byte_index").render_derived()
+    hex_byte = func.lpad(func.to_hex(func.coalesce(byte_values.c.value, 0)), 2, "0")
+    return (
+        select(func.decode(func.string_agg(hex_byte, aggregate_order_by(literal_column("''"), all_bytes.c.byte_index)), "hex", type_=LargeBinary))
+        .select_from(all_bytes.outerjoin(byte_values, byte_values.c.byte_index == all_bytes.c.byte_index))
+        .scalar_subquery()
+    )
+
+
+def _lesson_count(course_id):
+    # Fonte de verdade de courses.lesson_count.
+    return (
+        select(func.count(LessonModel.id))
+        .join(ModuleModel, ModuleModel.id == LessonModel.module_id)
+        .where(ModuleModel.course_id == course_id)
+        .scalar_subquery()
+    )
+
 
 class UserUseCases:
     def __init__(self, db: Session):
         self.db = db
 
-    def user_id_by_username(self, username: str):
-        user_id = self.db.query(UserModel.id).filter(UserModel.username == username).scalar()
-        if not user_id:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não existe")
-        return user_id
-
-    def ensure_professor(self, username: str):
-        user = self.db.query(UserModel).filter(UserModel.username == username).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não existe")
-        if user.type_user != "P":
+    def ensure_professor(self, principal: Principal):
+        if not principal.is_professor:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Acesso permitido apenas para professores"
             )
-        return user
-
-    def enroll(self, username: str, course_id: int):
-        # 1. Buscar usuário completo
-        user_id = self.user_id_by_username(username)
-        
-        # 2. Verificar se o curso existe
-        course = self.db.query(CourseModel).filter(CourseModel.id == course_id).first()
-        if not course:
+        return principal
+
+    def _insert_once(self, model, conflict_columns: list[str], **values) -> int | None:
+        # INSERT ... ON CONFLICT DO NOTHING RETURNING id: None quando a linha já existia.
+        return self.db.execute(
+            pg_insert(model)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=conflict_columns)
+            .returning(model.id)
+        ).scalar_one_or_none()
+
+    def enroll(self, principal: Principal, course_id: int):
+        # Um único INSERT: a unique (user_id, course_id) barra matrícula repetida e a FK barra curso inexistente.
+        try:
+            enrollment_id = self._insert_once(
+                EnrollmentModel,
+                ["user_id", "course_id"],
+                user_id=principal.id,
+                course_id=course_id,
+                registration_date=date.today(),
+                # Aulas concluídas antes da matrícula continuam contando no progresso.
+                completed_lessons=_completed_lessons_count(principal.id, course_id),
+                completed_bitmap=_completed_bitmap(principal.id, course_id)
+            )
+        except IntegrityError:
+            self.db.rollback()
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Curso não encontrado")
-        
-        # 3. Verificar se já está matriculado
-        existing = self.db.query(EnrollmentModel).filter(
-            EnrollmentModel.user_id == user_id,
-            EnrollmentModel.course_id == course_id
-        ).first()
-        if existing:
+
+        if enrollment_id is None:
+            self.db.rollback()
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Já matriculado neste curso")
-        
-        # 4. Criar matrícula
-        enrollment = EnrollmentModel(
-            user_id=user_id,
-            course_id=course_id,
-            registration_date=date.today()
-        )
-        
-        # 5. Salvar no banco
-        self.db.add(enrollment)
         self.db.commit()
-        self.db.refresh(enrollment)
+        return enrollment_id
 
-    def list_students_by_course(self, course_id: int, professor_username: str):
-        professor_id = self.user_id_by_username(professor_username)
+    def list_students_by_course(self, course_id: int, principal: Principal):
+        professor_id = principal.id
         course = self.db.query(CourseModel).filter(CourseModel.id == course_id).first()
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Curso não encontrado")
@@ -91,53 +193,30 @@ class UserUseCases:
             for enrollment in enrollments
         ]
 
-    def get_student_course_progress(self, username: str):
-        user_id = self.user_id_by_username(username)
-        enrollments = self.db.query(EnrollmentModel).filter(EnrollmentModel.user_id == user_id).all()
-        if not enrollments:
-            return []
-
-        course_ids = [enrollment.course_id for enrollment in enrollments]
-        courses = self.db.query(CourseModel).filter(CourseModel.id.in_(course_ids)).all()
-        course_by_id = {course.id: course for course in courses}
-
-        modules = self.db.query(ModuleModel).filter(ModuleModel.course_id.in_(course_ids)).all()
-        module_ids = [module.id for module in modules]
-        course_id_by_module_id = {module.id: module.course_id for module in modules}
-
-        lessons = self.db.query(LessonModel).filter(LessonModel.module_id.in_(module_ids)).all() if module_ids else []
-        lessons_by_course_id: dict[int, list[int]] = {}
-        for lesson in lessons:
-            course_id = course_id_by_module_id.get(lesson.module_id)
-            if course_id is None:
-                continue
-            lessons_by_course_id.setdefault(course_id, []).append(lesson.id)
-
-        all_lesson_ids = [lesson.id for lesson in lessons]
-        completed_lessons = (
-            self.db.query(LessonCompletionModel)
-            .filter(
-                LessonCompletionModel.user_id == user_id,
-                LessonCompletionModel.lesson_id.in_(all_lesson_ids),
+    def get_student_course_progress(self, principal: Principal):
+        # Uma query pela unique (user_id, course_id): os contadores já vêm prontos nas duas tabelas.
+        rows = (
+            self.db.query(
+                EnrollmentModel.course_id,
+                CourseModel.title,
+                CourseModel.lesson_count,
+                EnrollmentModel.completed_lessons,
             )
+            .join(CourseModel, CourseModel.id == EnrollmentModel.course_id)
+            .filter(EnrollmentModel.user_id == principal.id)
+            .order_by(EnrollmentModel.id)
             .all()
-            if all_lesson_ids
-            else []
         )
-        completed_lesson_ids = {item.lesson_id for item in completed_lessons}
 
         payload = []
-        for enrollment in enrollments:
-            lesson_ids = lessons_by_course_id.get(enrollment.course_id, [])
-            total_lessons = len(lesson_ids)
-            completed_count = sum(1 for lesson_id in lesson_ids if lesson_id in completed_lesson_ids)
+        for row in rows:
+            total_lessons = row.lesson_count
+            completed_count = min(row.completed_lessons, total_lessons)
             progress_percent = round((completed_count / total_lessons) * 100, 2) if total_lessons > 0 else 0.0
-
-            course = course_by_id.get(enrollment.course_id)
             payload.append(
                 {
-                    "course_id": enrollment.course_id,
-                    "course_title": course.title if course else None,
+                    "course_id": row.course_id,
+                    "course_title": row.title,
                     "total_lessons": total_lessons,
                     "completed_lessons": completed_count,
                     "progress_percent": progress_percent,
@@ -147,13 +226,32 @@ class UserUseCases:
 
         return payload
 
-    def get_completed_lesson_ids_by_course(self, username: str, course_id: int):
-        user_id = self.user_id_by_username(username)
+    def get_completed_lesson_ids_by_course(self, principal: Principal, course_id: int):
+        user_id = principal.id
 
         course = self.db.query(CourseModel).filter(CourseModel.id == course_id).first()
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Curso não encontrado")
 
+        if LESSON_COMPLETION_BITMAP:
+            enrollment = (
+                self.db.query(EnrollmentModel.completed_bitmap)
+                .filter(EnrollmentModel.user_id == user_id, EnrollmentModel.course_id == course_id)
+                .first()
+            )
+            # Sem matrícula não há bitmap: segue pelo caminho de lesson_completions.
+            if enrollment is not None:
+                completed_ordinals = _bitmap_ordinals(enrollment.completed_bitmap)
+                if not completed_ordinals:
+                    return []
+                lessons = (
+                    self.db.query(LessonModel.id, LessonModel.course_ordinal)
+                    .join(ModuleModel, ModuleModel.id == LessonModel.module_id)
+                    .filter(ModuleModel.course_id == course_id)
+                    .all()
+                )
+                return [lesson.id for lesson in lessons if lesson.course_ordinal in completed_ordinals]
+
         modules = self.db.query(ModuleModel.id).filter(ModuleModel.course_id == course_id).all()
         module_ids = [module_id for (module_id,) in modules]
         if not module_ids:
@@ -174,8 +272,8 @@ class UserUseCases:
         )
         return [lesson_id for (lesson_id,) in completions]
 
-    def get_course_certificate_payload(self, username: str, course_id: int):
-        user = self.db.query(UserModel).filter(UserModel.username == username).first()
+    def get_course_certificate_payload(self, principal: Principal, course_id: int):
+        user = self.db.query(UserModel).filter(UserModel.id == principal.id).first()
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não existe")
 
@@ -194,29 +292,34 @@ class UserUseCases:
                 detail="Aluno não matriculado neste curso"
             )
 
-        modules = self.db.query(ModuleModel.id).filter(ModuleModel.course_id == course_id).all()
-        module_ids = [module_id for (module_id,) in modules]
-        lessons = (
-            self.db.query(LessonModel.id).filter(LessonModel.module_id.in_(module_ids)).all()
-            if module_ids
-            else []
-        )
-        lesson_ids = [lesson_id for (lesson_id,) in lessons]
-
-        completed_lesson_ids = set()
-        if lesson_ids:
-            completions = (
-                self.db.query(LessonCompletionModel.lesson_id)
-                .filter(
-                    LessonCompletionModel.user_id == user.id,
-                    LessonCompletionModel.lesson_id.in_(lesson_ids),
-                )
-                .all()
+        if LESSON_COMPLETION_BITMAP:
+            # Curso e matrícula já estão carregados: a elegibilidade sai sem nenhuma query extra.
+            total_lessons = course.lesson_count
+            completed_lessons = _bitmap_popcount(enrollment.completed_bitmap)
+        else:
+            modules = self.db.query(ModuleModel.id).filter(ModuleModel.course_id == course_id).all()
+            module_ids = [module_id for (module_id,) in modules]
+            lessons = (
+                self.db.query(LessonModel.id).filter(LessonModel.module_id.in_(module_ids)).all()
+                if module_ids
+                else []
             )
-            completed_lesson_ids = {lesson_id for (lesson_id,) in completions}
+            lesson_ids = [lesson_id for (lesson_id,) in lessons]
+
+            completed_lesson_ids = set()
+            if lesson_ids:
+                completions = (
+                    self.db.query(LessonCompletionModel.lesson_id)
+                    .filter(
+                        LessonCompletionModel.user_id == user.id,
+                        LessonCompletionModel.lesson_id.in_(lesson_ids),
+                    )
+                    .all()
+                )
+                completed_lesson_ids = {lesson_id for (lesson_id,) in completions}
 
-        total_lessons = len(lesson_ids)
-        completed_lessons = len(completed_lesson_ids)
+            total_lessons = len(lesson_ids)
+            completed_lessons = len(completed_lesson_ids)
         progress_percent = round((completed_lessons / total_lessons) * 100, 2) if total_lessons > 0 else 0.0
         eligible = total_lessons > 0 and completed_lessons == total_lessons
 
@@ -261,73 +364,72 @@ class UserUseCases:
             "digital_signature": digital_signature,
         }
 
-    def complete_module(self, username: str, module_id: int):
+    def complete_module(self, principal: Principal, module_id: int):
         # Lógica para marcar um módulo como completo para o usuário
         try:
-            user_id = self.user_id_by_username(username)
-            
-            # Verificar se já foi completado
-            existing_completion = self.db.query(ModuleCompletionModel).filter(
-                ModuleCompletionModel.user_id == user_id,
-                ModuleCompletionModel.module_id == module_id
-            ).first()
-            
-            if existing_completion:
+            completion_id = self._insert_once(
+                ModuleCompletionModel,
+                ["user_id", "module_id"],
+                user_id=principal.id,
+                module_id=module_id,
+                completion_date=date.today()
+            )
+            if completion_id is None:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Módulo já foi completado anteriormente"
                 )
-            
-            completion = ModuleCompletionModel(
-                user_id=user_id,
-                module_id=module_id,
-                completion_date=date.today()
-            )
-            # Salvar no banco
-            self.db.add(completion)
             self.db.commit()
-            self.db.refresh(completion)
+            return completion_id
 
         except HTTPException:
+            self.db.rollback()
             raise
         except Exception as e:  
+            self.db.rollback()
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Erro ao completar módulo: " + str(e))
         
-    def complete_lesson(self, username: str, lesson_id: int):
+    def complete_lesson(self, principal: Principal, lesson_id: int):
         # Lógica para marcar uma aula como completa para o usuário
         try:
-            user_id = self.user_id_by_username(username)
-            
-            # Verificar se já foi completada
-            existing_completion = self.db.query(LessonCompletionModel).filter(
-                LessonCompletionModel.user_id == user_id,
-                LessonCompletionModel.lesson_id == lesson_id
-            ).first()
-            
-            if existing_completion:
+            completion_id = self._insert_once(
+                LessonCompletionModel,
+                ["user_id", "lesson_id"],
+                user_id=principal.id,
+                lesson_id=lesson_id,
+                completion_date=date.today()
+            )
+            if completion_id is None:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Aula já foi completada anteriormente"
                 )
-            
-            completion = LessonCompletionModel(
-                user_id=user_id,
-                lesson_id=lesson_id,
-                completion_date=date.today()
+            # Só quando a conclusão é nova; sem matrícula no curso o UPDATE não acha linha.
+            self.db.execute(
+                update(EnrollmentModel)
+                .where(
+                    EnrollmentModel.user_id == principal.id,
+                    EnrollmentModel.course_id == _course_id_of_lesson(lesson_id),
+                )
+                .values(
+                    completed_lessons=EnrollmentModel.completed_lessons + 1,
+                    completed_bitmap=_bitmap_with_lesson(lesson_id),
+                )
+                .execution_options(synchronize_session=False)
             )
-            # Salvar no banco
-            self.db.add(completion)
             self.db.commit()
-            self.db.refresh(completion)
+            return completion_id
 
         except HTTPException:
+            self.db.rollback()
             raise
         except Exception as e:  
+            self.db.rollback()
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Erro ao completar aula: " + str(e))
 
-    def answer_quiz(self, username: str, quiz_id: int, answer_option_ids: list[int]):
+    def answer_quiz(self, principal: Principal, quiz_id: int, answer_option_ids: list[int]):
         try:
-            user_id = self.user_id_by_username(username)
+            user_id = principal.id
 
             questions = self.db.query(QuizQuestionModel).filter(
                 QuizQuestionModel.quiz_id == quiz_id
@@ -338,18 +440,6 @@ class UserUseCases:
                     detail="Quiz não encontrado ou sem perguntas cadastradas"
                 )
             
-            # Verificar se o usuário já respondeu ao quiz
-            existing_attempt = self.db.query(QuizAttemptModel).filter(
-                QuizAttemptModel.user_id == user_id,
-                QuizAttemptModel.quiz_id == quiz_id
-            ).first()
-            
-            if existing_attempt :
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Quiz já foi respondido anteriormente"
-                )
-
             options = self.db.query(QuizOptionModel).filter(
                 QuizOptionModel.question_id.in_([question.id for question in questions])
             ).all()
@@ -382,42 +472,57 @@ class UserUseCases:
                     detail="É necessário responder todas as perguntas do quiz"
                 )
             
-            # Criar a resposta do quiz
-            quiz_attempt = QuizAttemptModel(
+            score = sum(1 for option_id in answered_by_question_id.values() if option_by_id[option_id].is_correct)
+            score_percentage = int(round((score / len(questions)) * 100)) if questions else 0
+
+            # A unique (user_id, quiz_id) decide quem respondeu primeiro: sem SELECT prévio.
+            attempt_id = self._insert_once(
+                QuizAttemptModel,
+                ["user_id", "quiz_id"],
                 user_id=user_id,
                 quiz_id=quiz_id,
                 attempt_date=date.today(),
-                score=0
+                score=score_percentage
             )
-            self.db.add(quiz_attempt)
-            self.db.commit()
-            self.db.refresh(quiz_attempt)
-            
-            # Adicionar as opções de resposta selecionadas
-            score = 0
-            for question in questions:
-                option_id = answered_by_question_id[question.id]
-                option = option_by_id[option_id]
-                if option.is_correct:
-                    score += 1
-                quiz_answer = QuizAnswerModel(
-                    attempt_id=quiz_attempt.id,
-                    question_id=option.question_id,
-                    selected_option_id=option_id,
-                    is_correct=option.is_correct
+            if attempt_id is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Quiz já foi respondido anteriormente"
                 )
-                self.db.add(quiz_answer)
-                
-            # Calcular a pontuação final
-            score_percentage = int(round((score / len(questions)) * 100)) if questions else 0
-            quiz_attempt.score = score_percentage
 
-            self.db.add(quiz_attempt)
+            self.db.add_all([
+                QuizAnswerModel(
+                    attempt_id=attempt_id,
+                    question_id=question.id,
+                    selected_option_id=answered_by_question_id[question.id],
+                    is_correct=option_by_id[answered_by_question_id[question.id]].is_correct
+                )
+                for question in questions
+            ])
+
+            # Incremento atômico no banco (total = total + 1), na mesma transação das respostas.
+            # Linhas em ordem de question_id: tentativas simultâneas no mesmo quiz travam na mesma ordem.
+            stats_insert = pg_insert(QuizQuestionStatsModel).values([
+                {
+                    "question_id": question_id,
+                    "total_answers": 1,
+                    "correct_answers": int(bool(option_by_id[answered_by_question_id[question_id]].is_correct)),
+                }
+                for question_id in sorted(question_ids)
+            ])
+            self.db.execute(
+                stats_insert.on_conflict_do_update(
+                    index_elements=[QuizQuestionStatsModel.question_id],
+                    set_={
+                        "total_answers": QuizQuestionStatsModel.total_answers + stats_insert.excluded.total_answers,
+                        "correct_answers": QuizQuestionStatsModel.correct_answers + stats_insert.excluded.correct_answers,
+                    }
+                )
+            )
             self.db.commit()
-            self.db.refresh(quiz_attempt)
             return {
-                "attempt_id": quiz_attempt.id,
-                "score": quiz_attempt.score,
+                "attempt_id": attempt_id,
+                "score": score_percentage,
                 "correct_answers": score,
                 "total_questions": len(questions),
             }
@@ -428,3 +533,139 @@ class UserUseCases:
         except Exception as e:
             self.db.rollback()
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Erro ao responder quiz: " + str(e))
+
+    def reconcile_progress_counters(self, batch_size: int = PROGRESS_RECONCILE_BATCH_SIZE):
+        # Recalcula courses.lesson_count e course_enrollments.completed_lessons e devolve quantas
+        # linhas estavam divergentes. Lotes de cursos (keyset por id), uma transação por lote, e só
+        # as linhas do lote ficam travadas: FOR UPDATE nos cursos segura LessonUseCases.create (que
+        # atualiza a linha do curso) e nas matrículas segura complete_lesson. A contagem roda
+        # depois dos locks, então vê o que já foi commitado; o que vier depois incrementa por cima.
+        last_id = 0
+        courses = 0
+        enrollments = 0
+        while True:
+            try:
+                course_ids = self.db.execute(
+                    select(CourseModel.id)
+                    .where(CourseModel.id > last_id)
+                    .order_by(CourseModel.id)
+                    .limit(batch_size)
+                    .with_for_update()
+                ).scalars().all()
+                if not course_ids:
+                    self.db.commit()
+                    break
+
+                locked_enrollments = (
+                    select(EnrollmentModel.id)
+                    .where(EnrollmentModel.course_id.in_(course_ids))
+                    .order_by(EnrollmentModel.id)
+                    .with_for_update()
+                    .subquery()
+                )
+                self.db.execute(select(func.count()).select_from(locked_enrollments))
+
+                lesson_count = _lesson_count(CourseModel.id)
+                courses += self.db.execute(
+                    update(CourseModel)
+                    .where(CourseModel.id.in_(course_ids), CourseModel.lesson_count != lesson_count)
+                    # Mantém updated_at: corrigir o contador não é edição do curso.
+                    .values(lesson_count=lesson_count, updated_at=CourseModel.updated_at)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                completed_lessons = _completed_lessons_count(EnrollmentModel.user_id, EnrollmentModel.course_id)
+                enrollments += self.db.execute(
+                    update(EnrollmentModel)
+                    .where(EnrollmentModel.course_id.in_(course_ids), EnrollmentModel.completed_lessons != completed_lessons)
+                    .values(completed_lessons=completed_lessons)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+            last_id = course_ids[-1]
+
+        return {"courses": courses, "enrollments": enrollments}
+
+    def _assign_missing_lesson_ordinals(self) -> int:
+        # Aulas gravadas por fora de LessonUseCases.create (seed, SQL manual) ficam sem posição:
+        # recebem as próximas do curso, na ordem de id. O lock barra criações de aula enquanto isso.
+        try:
+            self.db.execute(text("LOCK TABLE lessons IN SHARE ROW EXCLUSIVE MODE"))
+            assigned = self.db.execute(text(
+                """
+                UPDATE lessons SET course_ordinal = numbered.course_ordinal
+                FROM (
+                    SELECT lessons.id,
+                           coalesce(max(lessons.course_ordinal) OVER (PARTITION BY modules.course_id), -1)
+                           + count(*) FILTER (WHERE lessons.course_ordinal IS NULL)
+                             OVER (PARTITION BY modules.course_id ORDER BY lessons.id) AS course_ordinal
+                    FROM lessons JOIN modules ON modules.id = lessons.module_id
+                ) AS numbered
+                WHERE lessons.id = numbered.id AND lessons.course_ordinal IS NULL
+                """
+            )).rowcount
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return assigned
+
+    def rebuild_completion_bitmaps(self, batch_size: int = COMPLETION_BITMAP_BATCH_SIZE):
+        # Recalcula course_enrollments.completed_bitmap a partir de lesson_completions, em lotes
+        # de matrículas (keyset por id). Cada lote é uma transação com lesson_completions em
+        # SHARE: um complete_lesson concorrente espera o lote e liga o bit por cima do recálculo.
+        ordinals_assigned = self._assign_missing_lesson_ordinals()
+        last_id = 0
+        rebuilt = 0
+        while True:
+            try:
+                self.db.execute(text("LOCK TABLE lesson_completions IN SHARE MODE"))
+                enrollment_ids = self.db.execute(
+                    select(EnrollmentModel.id)
+                    .where(EnrollmentModel.id > last_id)
+                    .order_by(EnrollmentModel.id)
+                    .limit(batch_size)
+                ).scalars().all()
+                if not enrollment_ids:
+                    self.db.commit()
+                    break
+
+                completed = self.db.execute(
+                    select(EnrollmentModel.id, LessonModel.course_ordinal)
+                    .join(LessonCompletionModel, LessonCompletionModel.user_id == EnrollmentModel.user_id)
+                    .join(LessonModel, LessonModel.id == LessonCompletionModel.lesson_id)
+                    .join(ModuleModel, ModuleModel.id == LessonModel.module_id)
+                    .where(
+                        EnrollmentModel.id.in_(enrollment_ids),
+                        ModuleModel.course_id == EnrollmentModel.course_id,
+                        LessonModel.course_ordinal.is_not(None),
+                    )
+                ).all()
+                ordinals_by_enrollment: dict[int, list[int]] = {}
+                for enrollment_id, ordinal in completed:
+                    ordinals_by_enrollment.setdefault(enrollment_id, []).append(ordinal)
+
+                # UPDATE em lote pela chave primária (executemany).
+                self.db.execute(
+                    update(EnrollmentModel),
+                    [
+                        {"id": enrollment_id, "completed_bitmap": _bitmap_from_ordinals(ordinals_by_enrollment.get(enrollment_id, []))}
+                        for enrollment_id in enrollment_ids
+                    ]
+                )
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+            rebuilt += len(enrollment_ids)
+            last_id = enrollment_ids[-1]
+
+        return {"lesson_ordinals_assigned": ordinals_assigned, "enrollments": rebuilt}
+
+
+class AsyncUserUseCases(AsyncUseCases):
+    use_cases_class = UserUseCases
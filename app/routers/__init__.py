@@ -2,3 +2,4 @@ from .auth_router import auth_router
 from .course_router import course_router
 from .module_router import module_router
 from .lesson_router import lesson_router
+from .stats_router import stats_router
@@ -1,19 +1,35 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, status, UploadFile, File, Query, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
 
-from ..schemas import UserLogin, User as UserSchema, RefreshTokenRequest, LogoutRequest
-from ..utils import get_db_session
-from ..repositories import AuthUseCases
+from ..schemas import UserLogin, User as UserSchema, RefreshTokenRequest, LogoutRequest, Principal
+from ..utils import get_async_db_session, require_professor
+from ..utils.dependencies import optional_oauth2_scheme
+from ..utils.jobs import user_import_executor, run_user_import
+from ..utils.user_import import SUPPORTED_FORMATS, detect_format
+from ..repositories import AsyncAuthUseCases
+from ..core.rate_limit import (
+    client_ip,
+    enforce_rate_limits,
+    login_ip_limiter,
+    login_username_limiter,
+    register_ip_limiter,
+    register_username_limiter,
+)
 
 auth_router = APIRouter(prefix="/auth")
 
 
 @auth_router.post("/register")
-def register(user: UserSchema, db: Session = Depends(get_db_session)):
-    auth_uc = AuthUseCases(db)
-    auth_uc.register(user)
+async def register(user: UserSchema, request: Request, db: AsyncSession = Depends(get_async_db_session)):
+    # Barra rajadas antes de gastar CPU com hash de senha.
+    enforce_rate_limits(
+        (register_ip_limiter, client_ip(request)),
+        (register_username_limiter, user.username.strip().lower()),
+    )
+    auth_uc = AsyncAuthUseCases(db)
+    await auth_uc.register(user)
 
     return JSONResponse(
         content={ "msg": "sucess"},
@@ -21,16 +37,22 @@ def register(user: UserSchema, db: Session = Depends(get_db_session)):
     )
 
 @auth_router.post("/login")
-def login(request_form_user: OAuth2PasswordRequestForm = Depends(), 
-    db: Session = Depends(get_db_session)
+async def login(request: Request,
+    request_form_user: OAuth2PasswordRequestForm = Depends(), 
+    db: AsyncSession = Depends(get_async_db_session)
     ):
-    auth_uc = AuthUseCases(db)
+    # Barra rajadas antes de gastar CPU com hash de senha.
+    enforce_rate_limits(
+        (login_ip_limiter, client_ip(request)),
+        (login_username_limiter, request_form_user.username.strip().lower()),
+    )
+    auth_uc = AsyncAuthUseCases(db)
     user = UserLogin(
         username=request_form_user.username,
         password=request_form_user.password,
     )
 
-    data_auth = auth_uc.login(user=user)
+    data_auth = await auth_uc.login(user=user)
 
     return JSONResponse(
         content=data_auth,
@@ -39,9 +61,9 @@ def login(request_form_user: OAuth2PasswordRequestForm = Depends(),
 
 
 @auth_router.post("/refresh")
-def refresh_token(payload: RefreshTokenRequest, db: Session = Depends(get_db_session)):
-    auth_uc = AuthUseCases(db)
-    data_auth = auth_uc.refresh_access_token(payload.refresh_token)
+async def refresh_token(payload: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db_session)):
+    auth_uc = AsyncAuthUseCases(db)
+    data_auth = await auth_uc.refresh_access_token(payload.refresh_token)
     return JSONResponse(
         content=data_auth,
         status_code=status.HTTP_200_OK
@@ -49,10 +71,35 @@ def refresh_token(payload: RefreshTokenRequest, db: Session = Depends(get_db_ses
 
 
 @auth_router.post("/logout")
-def logout(payload: LogoutRequest, db: Session = Depends(get_db_session)):
-    auth_uc = AuthUseCases(db)
-    auth_uc.logout(payload.refresh_token)
+async def logout(
+    payload: LogoutRequest,
+    access_token: str | None = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    auth_uc = AsyncAuthUseCases(db)
+    await auth_uc.logout(payload.refresh_token, access_token)
     return JSONResponse(
         content={"msg": "success"},
         status_code=status.HTTP_200_OK
-    )
\ No newline at end of file
+    )
+
+
+@auth_router.post("/users/import")
+async def import_users(
+    file: UploadFile = File(...),
+    file_format: str | None = Query(default=None, alias="format"),
+    current_user: Principal = Depends(require_professor)
+):
+    file_format = file_format or detect_format(file.filename, file.content_type)
+    if file_format not in SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail='Formato deve ser "csv" ou "ndjson"'
+        )
+
+    content = await file.read()
+    report = await user_import_executor.run(run_user_import, content, file_format)
+    return JSONResponse(
+        content=report,
+        status_code=status.HTTP_200_OK
+    )
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, status, Query, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, status, Query, HTTPException, Header
+from fastapi.responses import JSONResponse, Response
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..utils import get_db_session, get_current_user
-from ..repositories import CoursesUseCases, UserUseCases, ModuleUseCases
-from ..schemas import Course as CourseSchema
+from ..utils import get_async_db_session, get_current_user, get_optional_user
+from ..repositories import AsyncCoursesUseCases, AsyncUserUseCases, AsyncModuleUseCases
+from ..repositories.course_repo import catalog_cache, catalog_cache_key, catalog_cache_storable
+from ..core.db_connection import recent_writers, reads_from_replica
+from ..schemas import Course as CourseSchema, Principal
 from io import BytesIO
 from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib import colors
 from reportlab.pdfgen import canvas
@@ -167,178 +170,243 @@ def _build_certificate_pdf(certificate: dict) -> bytes:
 course_router = APIRouter(prefix="/courses")
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
 @course_router.post("/")
-def create_course(
+async def create_course(
     course_data: CourseSchema,
-    db: Session = Depends(get_db_session),
-    current_user: dict = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_session),
+    current_user: Principal = Depends(get_current_user)
 ):
-    course_uc = CoursesUseCases(db)
-    user_uc = UserUseCases(db)
-    current_user_id = user_uc.user_id_by_username(current_user["sub"])
+    course_uc = AsyncCoursesUseCases(db)
 
-    if course_data.professor_id != current_user_id:
+    if course_data.professor_id != current_user.id:
         raise HTTPException(
             detail="Você só pode criar cursos para o professor autenticado.",
             status_code=status.HTTP_403_FORBIDDEN
         )
 
-    new_course = course_uc.create_course(course_data)
+    new_course = await course_uc.create_course(course_data)
     return JSONResponse(
         content=jsonable_encoder(new_course),
         status_code=status.HTTP_201_CREATED
     )
 
 @course_router.put("/{course_id}")
-def update_course(
+async def update_course(
     course_id: int,
     course_data: CourseSchema,
-    db: Session = Depends(get_db_session),
-    current_user: dict = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_session),
+    current_user: Principal = Depends(get_current_user)
 ):
-    course_uc = CoursesUseCases(db)
-    user_uc = UserUseCases(db)
-    current_user_id = user_uc.user_id_by_username(current_user["sub"])
+    course_uc = AsyncCoursesUseCases(db)
 
-    if course_data.professor_id != current_user_id:
+    if course_data.professor_id != current_user.id:
         raise HTTPException(
             detail="Você só pode atualizar cursos do professor autenticado.",
             status_code=status.HTTP_403_FORBIDDEN
         )
 
-    updated_course = course_uc.update_course(course_id, course_data)
+    updated_course = await course_uc.update_course(course_id, course_data)
     return JSONResponse(
         content=jsonable_encoder(updated_course),
         status_code=status.HTTP_200_OK
     )
 
 @course_router.post("/enrollments")
-def enroll_in_course(course_id: int, db: Session = Depends(get_db_session), current_user: dict = Depends(get_current_user)):
-    user_uc = UserUseCases(db)
-    user_uc.enroll(current_user["sub"], course_id)
+async def enroll_in_course(course_id: int, db: AsyncSession = Depends(get_async_db_session), current_user: Principal = Depends(get_current_user)):
+    user_uc = AsyncUserUseCases(db)
+    await user_uc.enroll(current_user, course_id)
     return JSONResponse(
         content={ "msg": "success" },
         status_code=status.HTTP_201_CREATED
     )
 
 @course_router.get("/")
-def list_courses(
+async def list_courses(
     search: str | None = Query(default=None),
     area: str | None = Query(default=None),
     level: str | None = Query(default=None),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1),
-    db: Session = Depends(get_db_session)
+    cursor: str | None = Query(default=None),
+    include_total: bool | None = Query(default=None),
+    sort: str = Query(default="recent", pattern="^(recent|relevance)$"),
+    db: AsyncSession = Depends(get_async_db_session),
+    current_user: Principal | None = Depends(get_optional_user)
 ):
-    course_uc = CoursesUseCases(db)
-    courses = course_uc.list_courses(
+    # Paginação por página continua trazendo o total, como antes; no cursor ele só vem se pedido.
+    if include_total is None:
+        include_total = cursor is None
+    cache_key = catalog_cache_key(
         search=search,
         area=area,
         level=level,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
+        sort=sort
     )
-    return JSONResponse(
+    # Quem escreveu há pouco lê do primário (read-your-writes): a página em cache pode ser anterior à escrita.
+    recent_writer = current_user is not None and recent_writers.get(current_user.id)
+    body = None if recent_writer else catalog_cache.get(cache_key)
+    if body is not None:
+        return Response(content=body, media_type="application/json", status_code=status.HTTP_200_OK)
+
+    course_uc = AsyncCoursesUseCases(db)
+    courses = await course_uc.list_courses(
+        search=search,
+        area=area,
+        level=level,
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
+        sort=sort
+    )
+    response = JSONResponse(
         content=jsonable_encoder(courses),
         status_code=status.HTTP_200_OK
     )
+    if catalog_cache_storable(served_by_replica=reads_from_replica(db)):
+        catalog_cache.set(cache_key, response.body)
+    return response
+
+
+# Declarada antes de /{course_id} para "suggest" não ser lido como id.
+@course_router.get("/suggest")
+async def suggest_courses(
+    q: str = Query(min_length=2, max_length=100),
+    limit: int = Query(default=8, ge=1, le=20),
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    course_uc = AsyncCoursesUseCases(db)
+    suggestions = await course_uc.suggest(q, limit)
+    return JSONResponse(
+        content=jsonable_encoder(suggestions),
+        status_code=status.HTTP_200_OK
+    )
 
 
 @course_router.get("/{course_id}")
-def get_course_details(course_id: int, db: Session = Depends(get_db_session)):
-    course_uc = CoursesUseCases(db)
-    course = course_uc.get_course_details(course_id)
+async def get_course_details(
+    course_id: int,
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    course_uc = AsyncCoursesUseCases(db)
+    etag = await course_uc.get_course_etag(course_id)
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    course = await course_uc.get_course_details(course_id)
     return JSONResponse(
         content=jsonable_encoder(course),
-        status_code=status.HTTP_200_OK
+        status_code=status.HTTP_200_OK,
+        headers={"ETag": etag}
     )
 
 
 @course_router.get("/{course_id}/modules")
-def list_course_modules(course_id: int, db: Session = Depends(get_db_session)):
-    module_uc = ModuleUseCases(db)
-    modules = module_uc.list_by_course_id(course_id)
+async def list_course_modules(
+    course_id: int,
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    etag = await AsyncCoursesUseCases(db).get_course_etag(course_id)
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    module_uc = AsyncModuleUseCases(db)
+    modules = await module_uc.list_by_course_id(course_id)
     return JSONResponse(
         content=jsonable_encoder(modules),
-        status_code=status.HTTP_200_OK
+        status_code=status.HTTP_200_OK,
+        headers={"ETag": etag}
     )
 
 @course_router.get("/{course_id}/students")
-def list_course_students(
+async def list_course_students(
     course_id: int,
-    db: Session = Depends(get_db_session),
-    current_user: dict = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_session),
+    current_user: Principal = Depends(get_current_user)
 ):
-    user_uc = UserUseCases(db)
-    students = user_uc.list_students_by_course(course_id, current_user["sub"])
+    user_uc = AsyncUserUseCases(db)
+    students = await user_uc.list_students_by_course(course_id, current_user)
     return JSONResponse(
         content=jsonable_encoder(students),
         status_code=status.HTTP_200_OK
     )
 
 @course_router.get("/professor/me/enrollments")
-def get_professor_enrollment_metrics(
-    db: Session = Depends(get_db_session),
-    current_user: dict = Depends(get_current_user)
+async def get_professor_enrollment_metrics(
+    db: AsyncSession = Depends(get_async_db_session),
+    current_user: Principal = Depends(get_current_user)
 ):
-    user_uc = UserUseCases(db)
-    professor = user_uc.ensure_professor(current_user["sub"])
-    course_uc = CoursesUseCases(db)
-    metrics = course_uc.get_professor_course_enrollment_metrics(professor.id)
+    user_uc = AsyncUserUseCases(db)
+    professor = await user_uc.ensure_professor(current_user)
+    course_uc = AsyncCoursesUseCases(db)
+    metrics = await course_uc.get_professor_course_enrollment_metrics(professor.id)
     return JSONResponse(
         content=jsonable_encoder(metrics),
         status_code=status.HTTP_200_OK
     )
 
 @course_router.get("/{course_id}/quiz-metrics")
-def get_course_quiz_metrics(
+async def get_course_quiz_metrics(
     course_id: int,
-    db: Session = Depends(get_db_session),
-    current_user: dict = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_session),
+    current_user: Principal = Depends(get_current_user)
 ):
-    user_uc = UserUseCases(db)
-    professor = user_uc.ensure_professor(current_user["sub"])
-    course_uc = CoursesUseCases(db)
-    metrics = course_uc.get_course_quiz_question_metrics(course_id, professor.id)
+    user_uc = AsyncUserUseCases(db)
+    professor = await user_uc.ensure_professor(current_user)
+    course_uc = AsyncCoursesUseCases(db)
+    metrics = await course_uc.get_course_quiz_question_metrics(course_id, professor.id)
     return JSONResponse(
         content=jsonable_encoder(metrics),
         status_code=status.HTTP_200_OK
     )
 
 @course_router.get("/students/me/progress")
-def get_student_progress(
-    db: Session = Depends(get_db_session),
-    current_user: dict = Depends(get_current_user)
+async def get_student_progress(
+    db: AsyncSession = Depends(get_async_db_session),
+    current_user: Principal = Depends(get_current_user)
 ):
-    user_uc = UserUseCases(db)
-    progress = user_uc.get_student_course_progress(current_user["sub"])
+    user_uc = AsyncUserUseCases(db)
+    progress = await user_uc.get_student_course_progress(current_user)
     return JSONResponse(
         content=jsonable_encoder(progress),
         status_code=status.HTTP_200_OK
     )
 
 @course_router.get("/{course_id}/students/me/completed-lessons")
-def get_student_completed_lessons_by_course(
+async def get_student_completed_lessons_by_course(
     course_id: int,
-    db: Session = Depends(get_db_session),
-    current_user: dict = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_session),
+    current_user: Principal = Depends(get_current_user)
 ):
-    user_uc = UserUseCases(db)
-    lesson_ids = user_uc.get_completed_lesson_ids_by_course(current_user["sub"], course_id)
+    user_uc = AsyncUserUseCases(db)
+    lesson_ids = await user_uc.get_completed_lesson_ids_by_course(current_user, course_id)
     return JSONResponse(
         content=jsonable_encoder({"course_id": course_id, "lesson_ids": lesson_ids}),
         status_code=status.HTTP_200_OK
     )
 
 @course_router.get("/{course_id}/students/me/certificate")
-def get_student_course_certificate(
+async def get_student_course_certificate(
     course_id: int,
     download: bool = Query(default=False),
-    db: Session = Depends(get_db_session),
-    current_user: dict = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_session),
+    current_user: Principal = Depends(get_current_user)
 ):
-    user_uc = UserUseCases(db)
-    certificate = user_uc.get_course_certificate_payload(current_user["sub"], course_id)
+    user_uc = AsyncUserUseCases(db)
+    certificate = await user_uc.get_course_certificate_payload(current_user, course_id)
 
     if not download:
         return JSONResponse(
@@ -354,6 +422,7 @@ def get_student_course_certificate(
 
     safe_course_title = "".join(ch if ch.isalnum() or ch in ("-", "_") else "_" for ch in certificate["course_title"])
     filename = f"certificado_{safe_course_title}_{course_id}.pdf"
-    file_buffer = BytesIO(_build_certificate_pdf(certificate))
+    # Gerar o PDF é CPU puro: roda no threadpool para não travar o event loop.
+    file_buffer = BytesIO(await run_in_threadpool(_build_certificate_pdf, certificate))
     headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
     return StreamingResponse(file_buffer, media_type="application/pdf", headers=headers)
@@ -1,44 +1,44 @@
 from fastapi import APIRouter, Depends, status
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.encoders import jsonable_encoder
 
-from app.utils import get_db_session, get_current_user
-from app.repositories import ModuleUseCases, UserUseCases
-from app.schemas import Module as ModuleSchema
+from app.utils import get_async_db_session, get_current_user
+from app.repositories import AsyncModuleUseCases, AsyncUserUseCases
+from app.schemas import Module as ModuleSchema, Principal
 
 module_router = APIRouter(prefix="/modules")
 
 @module_router.post("/")
-def create_module(
+async def create_module(
     module: ModuleSchema, 
-    db: Session = Depends(get_db_session),
-    current_user: dict = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_session),
+    current_user: Principal = Depends(get_current_user)
 ):
-    module_uc = ModuleUseCases(db)
-    created_module = module_uc.create(module, current_user["sub"])
+    module_uc = AsyncModuleUseCases(db)
+    created_module = await module_uc.create(module, current_user)
     return JSONResponse(
         content=jsonable_encoder(created_module),
         status_code=status.HTTP_201_CREATED
     )
 
 @module_router.get("/{module_id}")
-def get_module(module_id: int, db: Session = Depends(get_db_session)):
-    module_uc = ModuleUseCases(db)
-    module = module_uc.get_by_id(module_id)
+async def get_module(module_id: int, db: AsyncSession = Depends(get_async_db_session)):
+    module_uc = AsyncModuleUseCases(db)
+    module = await module_uc.get_by_id(module_id)
     return JSONResponse(
         content=jsonable_encoder(module),
         status_code=status.HTTP_200_OK
     )
 
 @module_router.post("/{module_id}")
-def complete_module(
+async def complete_module(
     module_id: int,
-    db: Session = Depends(get_db_session),
-    current_user: dict = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_session),
+    current_user: Principal = Depends(get_current_user)
 ):
-    user_uc = UserUseCases(db)
-    user_uc.complete_module(current_user["sub"], module_id)
+    user_uc = AsyncUserUseCases(db)
+    await user_uc.complete_module(current_user, module_id)
     return JSONResponse(
         content={ "msg": "success" },
         status_code=status.HTTP_200_OK
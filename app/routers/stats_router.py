@@ -0,0 +1,31 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from ..core.principal_cache import principal_cache
+from ..core.hashing import hashing_pool, bulk_hashing_pool
+from ..core.revocation import revoked_access_tokens
+from ..core.rate_limit import rate_limit_stats
+from ..utils.jobs import user_import_executor
+from ..core.db_connection import pool_stats, replica_stats
+from ..repositories.course_repo import course_suggest_cache, catalog_cache
+
+stats_router = APIRouter(prefix="/stats")
+
+
+@stats_router.get("/")
+def get_stats():
+    return JSONResponse(
+        content={
+            "principal_cache": principal_cache.stats(),
+            "password_hashing": hashing_pool.stats(),
+            "password_hashing_bulk": bulk_hashing_pool.stats(),
+            "revoked_access_tokens": revoked_access_tokens.stats(),
+            "rate_limits": rate_limit_stats(),
+            "user_imports": user_import_executor.stats(),
+            "db_pools": pool_stats(),
+            "read_replica": replica_stats(),
+            "course_suggest_cache": course_suggest_cache.stats(),
+            "catalog_cache": catalog_cache.stats(),
+        },
+        status_code=status.HTTP_200_OK
+    )
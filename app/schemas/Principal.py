@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+
+class Principal(BaseModel):
+    id: int
+    username: str
+    type_user: str
+
+    @property
+    def is_professor(self) -> bool:
+        return self.type_user == "P"
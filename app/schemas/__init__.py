@@ -5,4 +5,5 @@ from .Module import Module
 from .Lesson import Lesson, LessonVideo, LessonQuiz, QuizQuestion, QuizOption
 from .Completions import ModuleCompletion, LessonCompletion
 from .QuizAnswer import QuizAnswer, QuizAttempt
-from .AuthToken import RefreshTokenRequest, LogoutRequest
\ No newline at end of file
+from .AuthToken import RefreshTokenRequest, LogoutRequest
+from .Principal import Principal
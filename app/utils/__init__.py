@@ -1 +1 @@
-from .dependencies import get_db_session, get_current_user
\ No newline at end of file
+from .dependencies import get_db_session, get_async_db_session, get_current_user, get_optional_user, require_professor
\ No newline at end of file
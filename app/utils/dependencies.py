@@ -1,12 +1,15 @@
-from ..core.db_connection import Session as sessionmaker
-from fastapi import Depends, HTTPException, status
+from ..core.db_connection import Session as sessionmaker, AsyncSession as async_sessionmaker, bind_session_to_user
+from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt
 from fastapi.security import OAuth2PasswordBearer
 
-from ..repositories.auth_repo import AuthUseCases
+from ..repositories.auth_repo import AsyncAuthUseCases
+from ..schemas import Principal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="http://127.0.0.1:8000/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="http://127.0.0.1:8000/auth/login", auto_error=False)
 
 def get_db_session():
     try:
@@ -15,7 +18,13 @@ def get_db_session():
     finally:
         session.close()  
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db_session)):
+async def get_async_db_session(request: Request):
+    async with async_sessionmaker() as session:
+        # GETs podem ler da réplica; get_current_user desfaz isso para quem escreveu há pouco.
+        session.info["read_only"] = request.method in ("GET", "HEAD")
+        yield session
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db_session)) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -23,11 +32,36 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     )
     try:
         # Decodifica o token
-        uc = AuthUseCases(db)
-        payload = uc.verify_token(token)
+        uc = AsyncAuthUseCases(db)
+        principal = await uc.verify_token(token)
+        bind_session_to_user(db, principal.id)
         
-        return payload
+        return principal
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
     except jwt.JWTError:
-        raise credentials_exception
\ No newline at end of file
+        raise credentials_exception
+
+
+async def get_optional_user(
+    token: str | None = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db_session)
+) -> Principal | None:
+    # Rotas públicas: sem token (ou com token inválido) a requisição segue como anônima.
+    if not token:
+        return None
+    try:
+        principal = await AsyncAuthUseCases(db).verify_token(token)
+    except HTTPException:
+        return None
+    bind_session_to_user(db, principal.id)
+    return principal
+
+
+async def require_professor(current_user: Principal = Depends(get_current_user)) -> Principal:
+    if not current_user.is_professor:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso permitido apenas para professores"
+        )
+    return current_user
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+import logging
+
+from decouple import config
+from fastapi import HTTPException, status
+
+from ..core.db_connection import Session
+from ..core.revocation import revoked_access_tokens
+from ..core.tasks import BoundedExecutor
+from ..repositories.auth_repo import AuthUseCases
+from .user_import import parse_user_records
+
+
+logger = logging.getLogger(__name__)
+
+# 0 desativa a limpeza dentro da aplicação (ex.: quando roda via cron com scripts/purge_refresh_tokens.py).
+REFRESH_TOKEN_PURGE_INTERVAL = config("REFRESH_TOKEN_PURGE_INTERVAL", default=3600, cast=float)
+# Intervalo para trazer revogações feitas por outros workers/instâncias.
+REVOCATION_SYNC_INTERVAL = config("REVOCATION_SYNC_INTERVAL", default=30, cast=float)
+# Importações aceitas ao mesmo tempo por processo (rodando ou na fila); acima disso, 503.
+USER_IMPORT_MAX_PENDING = config("USER_IMPORT_MAX_PENDING", default=1, cast=int)
+
+user_import_executor = BoundedExecutor("user-import", workers=1, max_pending=USER_IMPORT_MAX_PENDING)
+
+
+def purge_refresh_tokens_job():
+    db = Session()
+    try:
+        auth_uc = AuthUseCases(db)
+        report = auth_uc.purge_refresh_tokens()
+        report["revoked_access_tokens_deleted"] = auth_uc.purge_revoked_access_tokens()
+    finally:
+        db.close()
+
+    logger.info(
+        "refresh_tokens purge: deleted=%s batches=%s elapsed_ms=%s",
+        report["deleted"],
+        len(report["batches"]),
+        [batch["elapsed_ms"] for batch in report["batches"]],
+    )
+    return report
+
+
+def sync_revoked_access_tokens_job():
+    synced_at = datetime.now(timezone.utc)
+    db = Session()
+    try:
+        rows = AuthUseCases(db).list_revoked_access_tokens(since=revoked_access_tokens.sync_since())
+    finally:
+        db.close()
+
+    revoked_access_tokens.load(rows, synced_at)
+    return len(rows)
+
+
+def run_user_import(content: bytes, file_format: str):
+    # Roda em user_import_executor: leitura do arquivo, hash e INSERTs fora do threadpool das rotas.
+    try:
+        records, errors = parse_user_records(content, file_format)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Arquivo deve estar em UTF-8"
+        )
+
+    db = Session()
+    try:
+        return AuthUseCases(db).bulk_register(records, errors)
+    finally:
+        db.close()
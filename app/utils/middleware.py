@@ -0,0 +1,42 @@
+import logging
+import time
+
+from fastapi import Request
+
+from ..core.query_stats import RequestQueryStats, current_query_stats
+
+
+logger = logging.getLogger("app.sql")
+
+
+async def sql_timing_middleware(request: Request, call_next):
+    stats = RequestQueryStats()
+    token = current_query_stats.set(stats)
+    started_at = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        current_query_stats.reset(token)
+    total_ms = (time.perf_counter() - started_at) * 1000
+
+    response.headers["Server-Timing"] = (
+        f'db;dur={stats.db_ms:.1f};desc="{stats.count} queries", app;dur={total_ms:.1f}'
+    )
+
+    repeated = stats.repeated()
+    level = logging.WARNING if stats.exceeds_thresholds() else logging.INFO
+    logger.log(
+        level,
+        "sql: method=%s path=%s status=%s queries=%s db_ms=%.1f total_ms=%.1f repeated=%s",
+        request.method,
+        request.url.path,
+        response.status_code,
+        stats.count,
+        stats.db_ms,
+        total_ms,
+        len(repeated),
+    )
+    for statement, count in repeated:
+        # Provável N+1: a mesma query rodou em loop.
+        logger.warning("sql repeated: path=%s count=%s statement=%s", request.url.path, count, " ".join(statement.split())[:300])
+    return response
@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+
+
+def detect_format(filename: str | None, content_type: str | None = None) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or (content_type or "").endswith("ndjson"):
+        return "ndjson"
+    return "csv"
+
+
+def parse_user_records(content: bytes, fmt: str) -> tuple[list[tuple[int, dict]], list[dict]]:
+    """Converte o arquivo em uma lista de (linha, registro) e uma lista de erros de leitura."""
+    text = content.decode("utf-8-sig")
+    records: list[tuple[int, dict]] = []
+    errors: list[dict] = []
+
+    if fmt == "ndjson":
+        for row, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                errors.append({"row": row, "username": None, "error": f"JSON inválido: {e.msg}"})
+                continue
+            if not isinstance(record, dict):
+                errors.append({"row": row, "username": None, "error": "Cada linha deve ser um objeto JSON"})
+                continue
+            records.append((row, record))
+        return records, errors
+
+    reader = csv.DictReader(io.StringIO(text))
+    # Linha 1 é o cabeçalho.
+    for row, record in enumerate(reader, start=2):
+        # Campos vazios ficam de fora para que os valores padrão do schema sejam aplicados.
+        records.append((row, {key.strip(): value.strip() for key, value in record.items() if key and value and value.strip()}))
+    return records, errors
@@ -0,0 +1,28 @@
+"""add courses.content_version for outline ETags
+
+Revision ID: 1e7b3d9f5a28
+Revises: 8c4f2b6d9e15
+Create Date: 2026-10-18 17:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1e7b3d9f5a28'
+down_revision: Union[str, Sequence[str], None] = '8c4f2b6d9e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('courses', sa.Column('content_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('courses', 'content_version')
@@ -0,0 +1,36 @@
+"""index courses (created_at desc, id desc) for keyset pagination
+
+Revision ID: 2f6a8c4e9b31
+Revises: 7e3c9a5b2d14
+Create Date: 2026-10-18 15:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f6a8c4e9b31'
+down_revision: Union[str, Sequence[str], None] = '7e3c9a5b2d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_courses_created_at_id',
+            'courses',
+            [sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_courses_created_at_id', table_name='courses', postgresql_concurrently=True, if_exists=True)
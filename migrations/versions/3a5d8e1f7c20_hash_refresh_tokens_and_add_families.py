@@ -0,0 +1,48 @@
+"""store refresh tokens as sha256 digests and group them in rotation families
+
+Revision ID: 3a5d8e1f7c20
+Revises: b7e4c2f1a9d0
+Create Date: 2026-10-18 09:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a5d8e1f7c20'
+down_revision: Union[str, Sequence[str], None] = 'b7e4c2f1a9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('refresh_tokens', sa.Column('token_hash', sa.LargeBinary(length=32), nullable=True))
+    op.add_column('refresh_tokens', sa.Column('family_id', sa.String(length=32), nullable=True))
+
+    op.execute("UPDATE refresh_tokens SET token_hash = sha256(convert_to(token, 'UTF8'))")
+    # Tokens antigos não têm família: cada um vira a própria família.
+    op.execute("UPDATE refresh_tokens SET family_id = md5(id::text || clock_timestamp()::text)")
+
+    op.alter_column('refresh_tokens', 'token_hash', nullable=False)
+    op.alter_column('refresh_tokens', 'family_id', nullable=False)
+    op.create_index('ix_refresh_tokens_token_hash', 'refresh_tokens', ['token_hash'], unique=True)
+    op.create_index('ix_refresh_tokens_family_id', 'refresh_tokens', ['family_id'])
+
+    op.drop_column('refresh_tokens', 'token')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # O token original não pode ser recuperado a partir do digest: as sessões existentes são descartadas.
+    op.execute("DELETE FROM refresh_tokens")
+    op.add_column('refresh_tokens', sa.Column('token', sa.Text(), nullable=False))
+    op.create_unique_constraint('refresh_tokens_token_key', 'refresh_tokens', ['token'])
+
+    op.drop_index('ix_refresh_tokens_family_id', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_token_hash', table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'family_id')
+    op.drop_column('refresh_tokens', 'token_hash')
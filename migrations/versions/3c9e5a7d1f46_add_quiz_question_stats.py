@@ -0,0 +1,45 @@
+"""add quiz_question_stats counters
+
+Revision ID: 3c9e5a7d1f46
+Revises: 1e7b3d9f5a28
+Create Date: 2026-10-18 17:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e5a7d1f46'
+down_revision: Union[str, Sequence[str], None] = '1e7b3d9f5a28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'quiz_question_stats',
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('total_answers', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('correct_answers', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['question_id'], ['quiz_questions.id']),
+        sa.PrimaryKeyConstraint('question_id'),
+    )
+    # Carga inicial a partir das respostas já gravadas; depois disso answer_quiz mantém os contadores.
+    op.execute(
+        """
+        INSERT INTO quiz_question_stats (question_id, total_answers, correct_answers)
+        SELECT question_id, count(*), count(*) FILTER (WHERE is_correct)
+        FROM quiz_answers
+        WHERE question_id IS NOT NULL
+        GROUP BY question_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('quiz_question_stats')
@@ -0,0 +1,51 @@
+"""index foreign key and lookup columns
+
+Revision ID: 4b8e2d7c1a63
+Revises: 9d4f1a6b2e57
+Create Date: 2026-10-18 14:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8e2d7c1a63'
+down_revision: Union[str, Sequence[str], None] = '9d4f1a6b2e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_courses_professor_id', 'courses', ['professor_id']),
+    ('ix_modules_course_id', 'modules', ['course_id']),
+    ('ix_lessons_module_id', 'lessons', ['module_id']),
+    ('ix_lesson_videos_lesson_id', 'lesson_videos', ['lesson_id']),
+    ('ix_lesson_quizzes_lesson_id', 'lesson_quizzes', ['lesson_id']),
+    ('ix_quiz_questions_quiz_id', 'quiz_questions', ['quiz_id']),
+    ('ix_quiz_options_question_id', 'quiz_options', ['question_id']),
+    ('ix_quiz_answers_question_id', 'quiz_answers', ['question_id']),
+    ('ix_quiz_answers_attempt_id', 'quiz_answers', ['attempt_id']),
+    ('ix_course_enrollments_user_id_course_id', 'course_enrollments', ['user_id', 'course_id']),
+    ('ix_course_enrollments_course_id', 'course_enrollments', ['course_id']),
+    ('ix_lesson_completions_user_id_lesson_id', 'lesson_completions', ['user_id', 'lesson_id']),
+    ('ix_module_completions_user_id_module_id', 'module_completions', ['user_id', 'module_id']),
+    ('ix_quiz_attempts_user_id_quiz_id', 'quiz_attempts', ['user_id', 'quiz_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação e não bloqueia escritas nas tabelas.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
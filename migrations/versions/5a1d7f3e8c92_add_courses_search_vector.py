@@ -0,0 +1,48 @@
+"""add generated full-text search vector to courses
+
+Revision ID: 5a1d7f3e8c92
+Revises: 2f6a8c4e9b31
+Create Date: 2026-10-18 16:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a1d7f3e8c92'
+down_revision: Union[str, Sequence[str], None] = '2f6a8c4e9b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('courses', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('portuguese', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('portuguese', coalesce(description, '')), 'B')",
+            persisted=True
+        )
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_courses_search_vector',
+            'courses',
+            ['search_vector'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_courses_search_vector', table_name='courses', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('courses', 'search_vector')
@@ -0,0 +1,57 @@
+"""add courses.lesson_count and course_enrollments.completed_lessons
+
+Revision ID: 6d2a8f4c7b19
+Revises: 3c9e5a7d1f46
+Create Date: 2026-10-18 18:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d2a8f4c7b19'
+down_revision: Union[str, Sequence[str], None] = '3c9e5a7d1f46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('courses', sa.Column('lesson_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('course_enrollments', sa.Column('completed_lessons', sa.Integer(), nullable=False, server_default='0'))
+    # Carga inicial; daqui em diante os contadores são mantidos pela aplicação
+    # (e corrigidos por scripts/reconcile_progress_counters.py).
+    op.execute(
+        """
+        UPDATE courses SET lesson_count = counts.lessons
+        FROM (
+            SELECT modules.course_id, count(*) AS lessons
+            FROM lessons JOIN modules ON modules.id = lessons.module_id
+            GROUP BY modules.course_id
+        ) AS counts
+        WHERE courses.id = counts.course_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE course_enrollments SET completed_lessons = counts.completed
+        FROM (
+            SELECT lesson_completions.user_id, modules.course_id, count(*) AS completed
+            FROM lesson_completions
+            JOIN lessons ON lessons.id = lesson_completions.lesson_id
+            JOIN modules ON modules.id = lessons.module_id
+            GROUP BY lesson_completions.user_id, modules.course_id
+        ) AS counts
+        WHERE course_enrollments.user_id = counts.user_id
+          AND course_enrollments.course_id = counts.course_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('course_enrollments', 'completed_lessons')
+    op.drop_column('courses', 'lesson_count')
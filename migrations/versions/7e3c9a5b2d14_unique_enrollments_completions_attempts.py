@@ -0,0 +1,126 @@
+"""unique (user, target) on enrollments, completions and quiz attempts
+
+Revision ID: 7e3c9a5b2d14
+Revises: 4b8e2d7c1a63
+Create Date: 2026-10-18 15:10:00.000000
+
+Linhas duplicadas impedem a unique. Por padrão a migration só as conta e para; para
+apagá-las (fica a mais antiga de cada par, e as respostas das tentativas removidas):
+
+    alembic -x dedupe=true upgrade head
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e3c9a5b2d14'
+down_revision: Union[str, Sequence[str], None] = '4b8e2d7c1a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+log = logging.getLogger(f"alembic.migration.{revision}")
+
+
+# (tabela, coluna alvo): a unique (user_id, alvo) substitui o índice composto criado antes.
+CONSTRAINTS = [
+    ('course_enrollments', 'course_id'),
+    ('lesson_completions', 'lesson_id'),
+    ('module_completions', 'module_id'),
+    ('quiz_attempts', 'quiz_id'),
+]
+
+
+def _duplicates(table: str, column: str) -> str:
+    # Toda linha que tem outra mais antiga com o mesmo (user_id, alvo).
+    return f"""
+        SELECT a.id FROM {table} a
+        WHERE EXISTS (
+            SELECT 1 FROM {table} b
+            WHERE b.user_id = a.user_id AND b.{column} = a.{column} AND b.id < a.id
+        )
+    """
+
+
+DUPLICATE_ANSWERS = f"SELECT id FROM quiz_answers WHERE attempt_id IN ({_duplicates('quiz_attempts', 'quiz_id')})"
+
+
+def _remove_duplicates() -> None:
+    bind = op.get_bind()
+    # Respostas de tentativas duplicadas saem antes das próprias tentativas (FK).
+    checks = [('quiz_answers', DUPLICATE_ANSWERS)] + [
+        (table, _duplicates(table, column)) for table, column in CONSTRAINTS
+    ]
+    found = {
+        table: bind.execute(sa.text(f"SELECT count(*) FROM ({query}) duplicates")).scalar()
+        for table, query in checks
+    }
+    if not any(found.values()):
+        return
+
+    summary = ", ".join(f"{table}={count}" for table, count in found.items() if count)
+    if context.get_x_argument(as_dictionary=True).get("dedupe", "").lower() != "true":
+        raise RuntimeError(
+            f"Linhas duplicadas encontradas ({summary}). Revise-as e rode de novo com "
+            "`alembic -x dedupe=true upgrade head` para apagar as mais novas."
+        )
+
+    for table, query in checks:
+        if found[table]:
+            deleted = bind.execute(sa.text(f"DELETE FROM {table} WHERE id IN ({query})")).rowcount
+            log.warning("%s: %d linhas duplicadas apagadas", table, deleted)
+
+
+def _constraint_exists(name: str) -> bool:
+    return op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_constraint WHERE conname = :name"), {"name": name}
+    ).first() is not None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _remove_duplicates()
+
+    # A remoção precisa estar commitada antes do índice; autocommit_block faz o commit.
+    # CREATE UNIQUE INDEX CONCURRENTLY não bloqueia escritas. Se uma duplicata nova entrar
+    # durante o build, ele falha e deixa o índice INVALID: o DROP abaixo limpa na próxima rodada.
+    with op.get_context().autocommit_block():
+        for table, column in CONSTRAINTS:
+            name = f'uq_{table}_user_id_{column}'
+            op.execute(
+                f"""
+                DO $$
+                BEGIN
+                    IF EXISTS (
+                        SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                        WHERE c.relname = '{name}' AND NOT i.indisvalid
+                    ) THEN
+                        DROP INDEX {name};
+                    END IF;
+                END $$
+                """
+            )
+            op.create_index(name, table, ['user_id', column], unique=True, postgresql_concurrently=True, if_not_exists=True)
+
+    # Com o índice pronto, a constraint só o adota: o lock é curto e não reconstrói nada.
+    for table, column in CONSTRAINTS:
+        name = f'uq_{table}_user_id_{column}'
+        if not _constraint_exists(name):
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name}")
+
+    # O índice composto de 4b8e2d7c1a63 tem as mesmas colunas da unique: sobra.
+    with op.get_context().autocommit_block():
+        for table, column in CONSTRAINTS:
+            op.drop_index(f'ix_{table}_user_id_{column}', table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table, column in reversed(CONSTRAINTS):
+            op.create_index(f'ix_{table}_user_id_{column}', table, ['user_id', column], postgresql_concurrently=True, if_not_exists=True)
+    for table, column in reversed(CONSTRAINTS):
+        op.drop_constraint(f'uq_{table}_user_id_{column}', table, type_='unique')
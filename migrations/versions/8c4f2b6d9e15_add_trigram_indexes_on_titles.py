@@ -0,0 +1,41 @@
+"""pg_trgm GIN indexes on course and lesson titles
+
+Revision ID: 8c4f2b6d9e15
+Revises: 5a1d7f3e8c92
+Create Date: 2026-10-18 16:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4f2b6d9e15'
+down_revision: Union[str, Sequence[str], None] = '5a1d7f3e8c92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for name, table in (('ix_courses_title_trgm', 'courses'), ('ix_lessons_title_trgm', 'lessons')):
+            op.create_index(
+                name,
+                table,
+                ['title'],
+                postgresql_using='gin',
+                postgresql_ops={'title': 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_lessons_title_trgm', table_name='lessons', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_courses_title_trgm', table_name='courses', postgresql_concurrently=True, if_exists=True)
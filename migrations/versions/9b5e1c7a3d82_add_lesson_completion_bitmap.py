@@ -0,0 +1,43 @@
+"""add lessons.course_ordinal and course_enrollments.completed_bitmap
+
+Revision ID: 9b5e1c7a3d82
+Revises: 6d2a8f4c7b19
+Create Date: 2026-10-18 18:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b5e1c7a3d82'
+down_revision: Union[str, Sequence[str], None] = '6d2a8f4c7b19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('lessons', sa.Column('course_ordinal', sa.Integer(), nullable=True))
+    op.add_column('course_enrollments', sa.Column('completed_bitmap', sa.LargeBinary(), nullable=True))
+    # Posições das aulas existentes, na ordem de criação dentro de cada curso. Os bitmaps
+    # são preenchidos por scripts/backfill_completion_bitmaps.py (em lotes, com a aplicação no ar).
+    op.execute(
+        """
+        UPDATE lessons SET course_ordinal = numbered.course_ordinal
+        FROM (
+            SELECT lessons.id,
+                   row_number() OVER (PARTITION BY modules.course_id ORDER BY lessons.id) - 1 AS course_ordinal
+            FROM lessons JOIN modules ON modules.id = lessons.module_id
+        ) AS numbered
+        WHERE lessons.id = numbered.id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('course_enrollments', 'completed_bitmap')
+    op.drop_column('lessons', 'course_ordinal')
@@ -0,0 +1,38 @@
+"""add revoked_access_tokens table
+
+Revision ID: 9d4f1a6b2e57
+Revises: 6c2e9b4d1f38
+Create Date: 2026-10-18 10:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4f1a6b2e57'
+down_revision: Union[str, Sequence[str], None] = '6c2e9b4d1f38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'revoked_access_tokens',
+        sa.Column('jti', sa.String(length=32), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index('ix_revoked_access_tokens_expires_at', 'revoked_access_tokens', ['expires_at'])
+    op.create_index('ix_revoked_access_tokens_revoked_at', 'revoked_access_tokens', ['revoked_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_revoked_access_tokens_revoked_at', table_name='revoked_access_tokens')
+    op.drop_index('ix_revoked_access_tokens_expires_at', table_name='revoked_access_tokens')
+    op.drop_table('revoked_access_tokens')
@@ -0,0 +1,33 @@
+"""index lesson_videos (lesson_id, id)
+
+Revision ID: a4c8e2f6b913
+Revises: 9b5e1c7a3d82
+Create Date: 2026-10-18 19:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f6b913'
+down_revision: Union[str, Sequence[str], None] = '9b5e1c7a3d82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # O composto cobre tudo que o índice só de lesson_id atendia.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_lesson_videos_lesson_id_id', 'lesson_videos', ['lesson_id', 'id'], postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_lesson_videos_lesson_id', table_name='lesson_videos', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_lesson_videos_lesson_id', 'lesson_videos', ['lesson_id'], postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_lesson_videos_lesson_id_id', table_name='lesson_videos', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,41 @@
+"""Recalcula os bitmaps de conclusão (course_enrollments.completed_bitmap).
+
+Rode uma vez depois da migration, antes de ligar LESSON_COMPLETION_BITMAP, e sempre que
+lesson_completions for alterada por fora da aplicação. Também dá posição (course_ordinal)
+às aulas que ficaram sem. Pode ser rodado com a aplicação no ar: cada lote é uma transação curta.
+
+Uso:
+    python scripts/backfill_completion_bitmaps.py --batch-size 1000
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.db_connection import Session
+from app.repositories import UserUseCases
+from app.repositories.user_repo import COMPLETION_BITMAP_BATCH_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill dos bitmaps de conclusão de aulas")
+    parser.add_argument("--batch-size", type=int, default=COMPLETION_BITMAP_BATCH_SIZE)
+    args = parser.parse_args()
+
+    session = Session()
+    try:
+        report = UserUseCases(session).rebuild_completion_bitmaps(batch_size=args.batch_size)
+    finally:
+        session.close()
+
+    print(f"- Aulas que receberam posição no curso: {report['lesson_ordinals_assigned']}")
+    print(f"- Matrículas com bitmap recalculado: {report['enrollments']}")
+
+
+if __name__ == "__main__":
+    main()
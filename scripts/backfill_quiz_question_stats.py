@@ -0,0 +1,33 @@
+"""Recalcula quiz_question_stats a partir de quiz_answers.
+
+A migration já faz a carga inicial; use este script para reconciliar os contadores
+depois de correções manuais em quiz_answers. Pode ser rodado com a aplicação no ar.
+
+Uso:
+    python scripts/backfill_quiz_question_stats.py
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.db_connection import Session
+from app.repositories import CoursesUseCases
+
+
+def main():
+    session = Session()
+    try:
+        questions = CoursesUseCases(session).rebuild_quiz_question_stats()
+    finally:
+        session.close()
+
+    print(f"Contadores recalculados para {questions} perguntas.")
+
+
+if __name__ == "__main__":
+    main()
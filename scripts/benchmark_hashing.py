@@ -0,0 +1,72 @@
+"""Mede o custo do hash de senhas para diferentes esquemas/rounds.
+
+Uso:
+    python scripts/benchmark_hashing.py --rounds 50000 100000 200000 535000
+    python scripts/benchmark_hashing.py --scheme bcrypt --rounds 10 12 --iterations 10
+
+O resultado ajuda a escolher PASSWORD_HASH_SCHEMES/PASSWORD_HASH_ROUNDS que
+caibam no orçamento de latência de login (p99).
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import statistics
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.hashing import build_crypt_context, PASSWORD_HASH_SCHEMES, PASSWORD_HASH_ROUNDS
+
+
+SAMPLE_PASSWORD = "Benchmark123"
+
+
+def benchmark(scheme: str, rounds: int, iterations: int) -> dict:
+    context = build_crypt_context(schemes=[scheme], rounds=rounds)
+    hashed = context.hash(SAMPLE_PASSWORD)
+
+    samples_ms = []
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        sample_start = time.perf_counter()
+        context.verify(SAMPLE_PASSWORD, hashed)
+        samples_ms.append((time.perf_counter() - sample_start) * 1000)
+    elapsed = time.perf_counter() - started_at
+
+    samples_ms.sort()
+    p99_index = min(len(samples_ms) - 1, int(round(len(samples_ms) * 0.99)) - 1)
+    return {
+        "scheme": scheme,
+        "rounds": rounds or "padrão",
+        "hashes_per_sec": iterations / elapsed if elapsed else 0.0,
+        "avg_ms": statistics.mean(samples_ms),
+        "p99_ms": samples_ms[max(p99_index, 0)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do custo de hash de senhas")
+    parser.add_argument("--scheme", default=PASSWORD_HASH_SCHEMES[0])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[PASSWORD_HASH_ROUNDS])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=None, help="orçamento de p99 por hash, em ms")
+    args = parser.parse_args()
+
+    print(f"{'esquema':<14} {'rounds':>10} {'hashes/s':>10} {'média ms':>10} {'p99 ms':>10}")
+    for rounds in args.rounds:
+        result = benchmark(args.scheme, rounds, args.iterations)
+        line = (
+            f"{result['scheme']:<14} {result['rounds']:>10} {result['hashes_per_sec']:>10.2f} "
+            f"{result['avg_ms']:>10.2f} {result['p99_ms']:>10.2f}"
+        )
+        if args.budget_ms is not None:
+            line += "  ok" if result["p99_ms"] <= args.budget_ms else "  acima do orçamento"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Roda EXPLAIN nas queries dos repositórios e falha se alguma fizer Seq Scan filtrado.
+
+Executa os casos de uso de leitura contra um Postgres local já populado
+(ex.: scripts/superpopulate_db.py), captura cada SELECT emitido e pede o plano
+ao Postgres. Por padrão o planner roda com enable_seqscan=off: numa base pequena
+o Seq Scan só continua no plano quando não existe índice que sirva a query.
+
+A mesma checagem roda na suíte (tests/test_query_plans.py) contra uma base mínima.
+
+Uso:
+    python scripts/check_query_plans.py
+    python scripts/check_query_plans.py --allow-seqscan --min-rows 10000
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import json
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi import HTTPException
+from sqlalchemy import event, text
+
+from app.core.db_connection import Session
+from app.models import User, Course, Module, Lesson, LessonQuiz
+from app.repositories import CoursesUseCases, ModuleUseCases, LessonUseCases, UserUseCases
+from app.schemas import Principal
+
+
+def _principal(user: User) -> Principal:
+    return Principal(id=user.id, username=user.username, type_user=user.type_user)
+
+
+def scenarios(session):
+    student = session.query(User).filter(User.type_user == "A").order_by(User.id).first()
+    course = session.query(Course).order_by(Course.id).first()
+    module = session.query(Module).order_by(Module.id).first()
+    lesson = session.query(Lesson).order_by(Lesson.id).first()
+    quiz = session.query(LessonQuiz).order_by(LessonQuiz.id).first()
+    owner = session.get(User, course.professor_id) if course else None
+    if not all([owner, student, course, module, lesson, quiz]):
+        raise ValueError("Base sem dados suficientes: rode scripts/superpopulate_db.py antes.")
+
+    courses_uc = CoursesUseCases(session)
+    module_uc = ModuleUseCases(session)
+    lesson_uc = LessonUseCases(session)
+    user_uc = UserUseCases(session)
+
+    return [
+        ("list_courses", lambda: courses_uc.list_courses(area=course.area, level=course.level)),
+        ("get_course_details", lambda: courses_uc.get_course_details(course.id)),
+        ("professor_enrollment_metrics", lambda: courses_uc.get_professor_course_enrollment_metrics(course.professor_id)),
+        ("course_quiz_metrics", lambda: courses_uc.get_course_quiz_question_metrics(course.id, course.professor_id)),
+        ("list_modules_by_course", lambda: module_uc.list_by_course_id(course.id)),
+        ("get_module", lambda: module_uc.get_by_id(module.id)),
+        ("get_lesson", lambda: lesson_uc.get_by_id(lesson.id)),
+        ("get_quiz_questions", lambda: lesson_uc.get_quiz_questions(quiz.id)),
+        ("get_quiz_with_attempt", lambda: lesson_uc.get_quiz_with_attempt_by_lesson_id(quiz.lesson_id, _principal(student))),
+        ("list_students_by_course", lambda: user_uc.list_students_by_course(course.id, _principal(owner))),
+        ("student_progress", lambda: user_uc.get_student_course_progress(_principal(student))),
+        ("completed_lessons", lambda: user_uc.get_completed_lesson_ids_by_course(_principal(student), course.id)),
+        ("certificate_payload", lambda: user_uc.get_course_certificate_payload(_principal(student), course.id)),
+    ]
+
+
+def _capture_selects(session, scenario):
+    captured = []
+    bind = session.get_bind()
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    event.listen(bind, "before_cursor_execute", capture)
+    try:
+        scenario()
+    except HTTPException:
+        # 403/404 ainda emitem as queries de verificação, que é o que interessa aqui.
+        pass
+    finally:
+        event.remove(bind, "before_cursor_execute", capture)
+        session.rollback()
+    return captured
+
+
+def _walk(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+
+def _is_filtered_full_scan(node) -> bool:
+    # Com enable_seqscan=off o planner troca o Seq Scan por uma varredura inteira de outro
+    # índice (sem Index Cond, só Filter): continua lendo a tabela toda.
+    if "Filter" not in node:
+        return False
+    if node.get("Node Type") == "Seq Scan":
+        return True
+    return node.get("Node Type") in ("Index Scan", "Index Only Scan") and "Index Cond" not in node
+
+
+def _explain(conn, statement, parameters):
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        result = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    return result[0]["Plan"] if isinstance(result, list) else json.loads(result)[0]["Plan"]
+
+
+def find_seq_scans(session, allow_seqscan: bool = False, min_rows: int = 0, report=None):
+    """Roda os cenários e devolve (cenário, tabela, filtro, SQL) de cada Seq Scan filtrado."""
+    failures = []
+    named_scenarios = scenarios(session)
+    with session.get_bind().connect() as conn:
+        table_rows = dict(conn.execute(text(
+            "SELECT relname, reltuples::bigint FROM pg_class WHERE relkind = 'r'"
+        )).all())
+        if not allow_seqscan:
+            conn.exec_driver_sql("SET enable_seqscan = off")
+
+        for name, scenario in named_scenarios:
+            statements = _capture_selects(session, scenario)
+            for statement, parameters in statements:
+                for node in _walk(_explain(conn, statement, parameters)):
+                    if not _is_filtered_full_scan(node):
+                        continue
+                    relation = node.get("Relation Name")
+                    # reltuples é -1 em tabela nunca analisada: sem --min-rows, tudo conta.
+                    if min_rows and table_rows.get(relation, 0) < min_rows:
+                        continue
+                    failures.append((name, relation, node["Filter"], " ".join(statement.split())))
+            if report:
+                report(f"- {name}: {len(statements)} queries")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checagem de planos das queries dos repositórios")
+    parser.add_argument("--allow-seqscan", action="store_true", help="Não desliga enable_seqscan no planner")
+    parser.add_argument("--min-rows", type=int, default=0, help="Só acusa Seq Scan em tabelas com pelo menos N linhas estimadas")
+    args = parser.parse_args()
+
+    session = Session()
+    try:
+        failures = find_seq_scans(session, allow_seqscan=args.allow_seqscan, min_rows=args.min_rows, report=print)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    finally:
+        session.close()
+
+    if failures:
+        print(f"\n{len(failures)} Seq Scan(s) filtrados encontrados:")
+        for name, relation, condition, statement in failures:
+            print(f"  [{name}] {relation}: {condition}\n      {statement[:300]}")
+        sys.exit(1)
+    print("\nNenhum Seq Scan filtrado encontrado.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Importa usuários em lote a partir de um arquivo CSV ou NDJSON.
+
+Uso:
+    python scripts/import_users.py turma_2026.csv --workers 8
+    python scripts/import_users.py turma_2026.ndjson --batch-size 2000
+
+Colunas/chaves aceitas: username, password, email, fullname, telephone, type_user.
+Linhas de professor (type_user=P) só são aceitas com --allow-professors.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import os
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.db_connection import Session
+from app.repositories.auth_repo import AuthUseCases, USER_IMPORT_BATCH_SIZE
+from app.utils.user_import import SUPPORTED_FORMATS, detect_format, parse_user_records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importação de usuários em lote")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=SUPPORTED_FORMATS, default=None)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processos para o hash das senhas")
+    parser.add_argument("--batch-size", type=int, default=USER_IMPORT_BATCH_SIZE)
+    parser.add_argument("--allow-professors", action="store_true", help="aceita linhas com type_user=P")
+    args = parser.parse_args()
+
+    file_format = args.format or detect_format(args.path.name)
+    records, errors = parse_user_records(args.path.read_bytes(), file_format)
+
+    started_at = time.perf_counter()
+    session = Session()
+    try:
+        report = AuthUseCases(session).bulk_register(
+            records,
+            errors,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            allow_professors=args.allow_professors,
+        )
+    finally:
+        session.close()
+    elapsed = time.perf_counter() - started_at
+
+    for error in report["errors"]:
+        print(f"- Linha {error['row']} ({error['username'] or '-'}): {error['error']}")
+    print(
+        f"Importação concluída em {elapsed:.1f}s: {report['received']} recebidos, "
+        f"{report['created']} criados, {report['failed']} com erro."
+    )
+
+
+if __name__ == "__main__":
+    main()
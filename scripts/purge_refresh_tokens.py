@@ -0,0 +1,50 @@
+"""Remove refresh tokens expirados em lotes.
+
+Tokens revogados ainda dentro da validade são mantidos: é pela linha deles que a
+reapresentação de um token já rotacionado derruba a família inteira.
+
+Uso:
+    python scripts/purge_refresh_tokens.py --retention-hours 24 --batch-size 5000
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.db_connection import Session
+from app.repositories.auth_repo import (
+    AuthUseCases,
+    REFRESH_TOKEN_RETENTION_HOURS,
+    REFRESH_TOKEN_PURGE_BATCH_SIZE,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Limpeza de refresh tokens expirados")
+    parser.add_argument("--retention-hours", type=float, default=REFRESH_TOKEN_RETENTION_HOURS)
+    parser.add_argument("--batch-size", type=int, default=REFRESH_TOKEN_PURGE_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+
+    session = Session()
+    try:
+        report = AuthUseCases(session).purge_refresh_tokens(
+            retention_hours=args.retention_hours,
+            batch_size=args.batch_size,
+            max_batches=args.max_batches,
+        )
+    finally:
+        session.close()
+
+    for index, batch in enumerate(report["batches"], start=1):
+        print(f"- Lote {index}: {batch['deleted']} tokens removidos em {batch['elapsed_ms']:.1f} ms")
+    print(f"Limpeza concluída: {report['deleted']} tokens removidos (corte: {report['cutoff']}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Reconcilia os contadores de progresso com as tabelas de origem.
+
+Recalcula courses.lesson_count (aulas do curso) e course_enrollments.completed_lessons
+(conclusões do aluno no curso). Os contadores são mantidos pela aplicação; este script
+corrige divergências de escritas feitas por fora dela (ex.: SQL manual, seeds).
+Pode ser rodado com a aplicação no ar: cada lote trava só os cursos do lote e suas matrículas.
+
+Uso:
+    python scripts/reconcile_progress_counters.py --batch-size 100
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.db_connection import Session
+from app.repositories import UserUseCases
+from app.repositories.user_repo import PROGRESS_RECONCILE_BATCH_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconciliação dos contadores de progresso")
+    parser.add_argument("--batch-size", type=int, default=PROGRESS_RECONCILE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    session = Session()
+    try:
+        report = UserUseCases(session).reconcile_progress_counters(batch_size=args.batch_size)
+    finally:
+        session.close()
+
+    print(f"- Cursos com lesson_count corrigido: {report['courses']}")
+    print(f"- Matrículas com completed_lessons corrigido: {report['enrollments']}")
+
+
+if __name__ == "__main__":
+    main()
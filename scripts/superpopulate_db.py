@@ -2,16 +2,18 @@ from __future__ import annotations
 
 from datetime import date, datetime, timezone
 from pathlib import Path
+import os
 import sys
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from passlib.context import CryptContext
 import yt_dlp
 
 from app.core.db_connection import Session
+from app.core.hashing import hash_passwords
+from app.repositories import UserUseCases
 from app.models import (
     User,
     Course,
@@ -25,12 +27,12 @@ from app.models import (
     LessonCompletion,
     QuizAttempt,
     QuizAnswer,
+    QuizQuestionStats,
     ModuleCompletion,
     RefreshToken,
 )
 
 
-crypt_context = CryptContext(schemes=["sha256_crypt"])
 DEFAULT_USER_PASSWORD = "12345678"
 FIRST_NAMES = [
     "João",
@@ -174,6 +176,7 @@ def clean_database(session):
     # Delete in dependency order to avoid FK issues.
     for model in [
         QuizAnswer,
+        QuizQuestionStats,
         QuizAttempt,
         QuizOption,
         QuizQuestion,
@@ -195,13 +198,14 @@ def clean_database(session):
 def create_users(session) -> tuple[list[User], list[User]]:
     professors: list[User] = []
     students: list[User] = []
+    # Mesma senha para todos os usuários, facilitando login em ambiente de seed.
+    password_hashes = iter(hash_passwords([DEFAULT_USER_PASSWORD] * (8 + 20), workers=os.cpu_count() or 1))
 
     for i in range(1, 9):
         full_name = build_full_name(i - 1, offset=1)
         user = User(
             username=f"prof{i}",
-            # Mesma senha para todos os usuários, facilitando login em ambiente de seed.
-            password=crypt_context.hash(DEFAULT_USER_PASSWORD),
+            password=next(password_hashes),
             email=f"prof{i}@seed.local",
             fullname=full_name,
             telephone=f"(11) 9{i:04d}-{i:04d}",
@@ -214,8 +218,7 @@ def create_users(session) -> tuple[list[User], list[User]]:
         full_name = build_full_name(i - 1, offset=5)
         user = User(
             username=f"aluno{i}",
-            # Mesma senha para todos os usuários, facilitando login em ambiente de seed.
-            password=crypt_context.hash(DEFAULT_USER_PASSWORD),
+            password=next(password_hashes),
             email=f"aluno{i}@seed.local",
             fullname=full_name,
             telephone=f"(21) 9{i:04d}-{(i + 1000):04d}",
@@ -365,6 +368,9 @@ def main():
         clean_database(session)
         professors, students = create_users(session)
         courses_total, skipped_courses = create_courses_and_content(session, professors, students)
+        # O seed grava aulas e conclusões direto pelo ORM: acerta contadores e bitmaps de progresso no fim.
+        UserUseCases(session).reconcile_progress_counters()
+        UserUseCases(session).rebuild_completion_bitmaps()
         print("Superpopulação concluída com sucesso.")
         print(f"- Senha padrão para todos os usuários: {DEFAULT_USER_PASSWORD}")
         print(f"- Professores criados: {len(professors)}")
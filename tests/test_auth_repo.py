@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.models import RefreshToken
+from app.repositories import AuthUseCases
+from app.repositories.auth_repo import hash_refresh_token
+from app.schemas import UserLogin
+
+from .conftest import DEFAULT_PASSWORD
+
+
+def test_replayed_refresh_token_revokes_family_after_purge(db, create_user):
+    create_user("aluno")
+    auth = AuthUseCases(db)
+    first = auth.login(UserLogin(username="aluno", password=DEFAULT_PASSWORD))["refresh_token"]
+    second = auth.refresh_access_token(first)["refresh_token"]
+
+    # O token rotacionado é antigo (criado há dias), mas ainda dentro da validade do JWT.
+    db.query(RefreshToken).filter(RefreshToken.token_hash == hash_refresh_token(first)).update(
+        {"created_at": datetime.now(timezone.utc) - timedelta(days=3)}
+    )
+    db.commit()
+
+    report = auth.purge_refresh_tokens(retention_hours=24)
+    assert report["deleted"] == 0
+
+    with pytest.raises(HTTPException) as replay:
+        auth.refresh_access_token(first)
+    assert replay.value.status_code == 401
+
+    # Reuso detectado: o token legítimo mais recente da família também foi derrubado.
+    with pytest.raises(HTTPException) as current:
+        auth.refresh_access_token(second)
+    assert current.value.status_code == 401
+
+
+def test_purge_removes_tokens_expired_before_cutoff(db, create_user):
+    user = create_user("aluno")
+    auth = AuthUseCases(db)
+    auth.login(UserLogin(username="aluno", password=DEFAULT_PASSWORD))
+    db.query(RefreshToken).filter(RefreshToken.user_id == user.id).update(
+        {"expires_at": datetime.now(timezone.utc) - timedelta(hours=48)}
+    )
+    db.commit()
+
+    assert auth.purge_refresh_tokens(retention_hours=24)["deleted"] == 1
+
+
+def test_bulk_register_rejects_professor_rows(db):
+    records = [
+        (2, {"username": "aluno1", "password": DEFAULT_PASSWORD, "email": "aluno1@reflex.com", "fullname": "Aluno", "telephone": "(11)99999-0001", "type_user": "A"}),
+        (3, {"username": "prof1", "password": DEFAULT_PASSWORD, "email": "prof1@reflex.com", "fullname": "Prof", "telephone": "(11)99999-0002", "type_user": "P"}),
+    ]
+    report = AuthUseCases(db).bulk_register(records)
+
+    assert report["created"] == 1
+    assert report["errors"] == [{"row": 3, "username": "prof1", "error": "Importação não pode criar professores"}]
+    assert AuthUseCases(db).bulk_register(records[1:], allow_professors=True)["created"] == 1
+
+
+def test_login_primes_principal_cache(db, create_user):
+    from app.core.principal_cache import principal_cache
+
+    user = create_user("aluno")
+    principal_cache.clear()
+    AuthUseCases(db).login(UserLogin(username="aluno", password=DEFAULT_PASSWORD))
+
+    assert principal_cache.get("aluno") == {"id": user.id, "username": "aluno", "type_user": "A"}
+
+
+def test_async_login_waits_for_hash_outside_transaction(db, create_user, monkeypatch):
+    import asyncio
+    from app.core.db_connection import AsyncSession, async_engine
+    from app.repositories import AsyncAuthUseCases
+    from app.repositories import auth_repo
+
+    create_user("aluno")
+    verify = auth_repo.averify_and_update_password
+    open_transactions = []
+
+    async def scenario():
+        async with AsyncSession() as session:
+            async def checked_verify(password, password_hash):
+                open_transactions.append(session.in_transaction())
+                return await verify(password, password_hash)
+
+            monkeypatch.setattr(auth_repo, "averify_and_update_password", checked_verify)
+            try:
+                return await AsyncAuthUseCases(session).login(UserLogin(username="aluno", password=DEFAULT_PASSWORD))
+            finally:
+                await async_engine.dispose()
+
+    assert asyncio.run(scenario())["username"] == "aluno"
+    assert open_transactions == [False]
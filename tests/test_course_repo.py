@@ -0,0 +1,98 @@
+import pytest
+
+from app.models import User
+from app.repositories import CoursesUseCases, LessonUseCases
+from app.repositories import course_repo
+from app.schemas import Lesson as LessonSchema
+
+
+def test_suggest_sees_lesson_created_after_cached_lookup(db, create_course):
+    course, module, principal = create_course("Python do zero")
+    courses = CoursesUseCases(db)
+
+    assert courses.suggest("decoradores")["lessons"] == []
+
+    lesson = LessonUseCases(db).create(
+        LessonSchema(title="Decoradores em Python", content_type="V", module_id=module.id),
+        principal,
+    )
+
+    lessons = courses.suggest("decoradores")["lessons"]
+    assert [item["id"] for item in lessons] == [lesson.id]
+
+
+def test_course_etag_changes_when_professor_is_renamed(db, create_course):
+    course, _, principal = create_course("Python do zero")
+    courses = CoursesUseCases(db)
+    etag = courses.get_course_etag(course.id)
+
+    db.query(User).filter(User.id == principal.id).update({"fullname": "Professora Renomeada"})
+    db.commit()
+
+    assert courses.get_course_etag(course.id) != etag
+    assert courses.get_course_details(course.id)["professor_name"] == "Professora Renomeada"
+
+
+def test_catalog_page_read_on_replica_right_after_write_is_not_cached(monkeypatch):
+    course_repo.invalidate_catalog_cache()
+
+    assert not course_repo.catalog_cache_storable(served_by_replica=True)
+    assert course_repo.catalog_cache_storable(served_by_replica=False)
+
+    later = course_repo.time.monotonic() + course_repo.REPLICA_STICKY_SECONDS
+    monkeypatch.setattr(course_repo.time, "monotonic", lambda: later)
+    assert course_repo.catalog_cache_storable(served_by_replica=True)
+
+
+def test_rebuild_quiz_question_stats_zeroes_questions_without_answers(db, create_course, create_user):
+    from app.models import LessonQuiz, QuizAnswer, QuizAttempt, QuizQuestion, QuizQuestionStats
+
+    _, module, principal = create_course("Python do zero")
+    lesson = LessonUseCases(db).create(LessonSchema(title="Quiz 1", content_type="Q", module_id=module.id), principal)
+    student = create_user("aluno")
+    quiz = LessonQuiz(lesson_id=lesson.id)
+    db.add(quiz)
+    db.flush()
+    question = QuizQuestion(quiz_id=quiz.id, question_text="2 + 2?")
+    attempt = QuizAttempt(user_id=student.id, quiz_id=quiz.id, score=1)
+    db.add_all([question, attempt])
+    db.flush()
+    db.add(QuizAnswer(attempt_id=attempt.id, question_id=question.id, is_correct=True))
+    db.commit()
+
+    courses = CoursesUseCases(db)
+    assert courses.rebuild_quiz_question_stats() == 1
+
+    # Correção manual: a resposta some de quiz_answers.
+    db.query(QuizAnswer).delete()
+    db.commit()
+    assert courses.rebuild_quiz_question_stats() == 1
+
+    stats = db.get(QuizQuestionStats, question.id)
+    db.refresh(stats)
+    assert (stats.total_answers, stats.correct_answers) == (0, 0)
+
+
+class _FailingSession:
+    def __init__(self, pgcode):
+        self.error = type("DatabaseError", (Exception,), {"pgcode": pgcode})()
+
+    def execute(self, *args, **kwargs):
+        raise course_repo.DBAPIError("SELECT", {}, self.error)
+
+    def rollback(self):
+        pass
+
+    def in_transaction(self):
+        return False
+
+
+def test_suggest_reports_statement_timeout_as_timed_out():
+    result = CoursesUseCases(_FailingSession(course_repo.QUERY_CANCELED_SQLSTATE)).suggest("python sem cache")
+    assert result["timed_out"] is True
+
+
+def test_suggest_propagates_other_database_errors():
+    # 42883: undefined_function (pg_trgm ausente, por exemplo).
+    with pytest.raises(course_repo.DBAPIError):
+        CoursesUseCases(_FailingSession("42883")).suggest("python sem cache")
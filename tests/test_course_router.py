@@ -0,0 +1,37 @@
+import asyncio
+import json
+
+from app.repositories import CoursesUseCases
+from app.schemas import Course as CourseSchema
+
+
+def _list_courses(**params):
+    from app.core.db_connection import AsyncSession, async_engine
+    from app.routers.course_router import list_courses
+
+    query = {"search": None, "area": None, "level": None, "page": 1, "page_size": 1,
+             "cursor": None, "include_total": None, "sort": "recent", "current_user": None}
+    query.update(params)
+
+    async def scenario():
+        try:
+            async with AsyncSession() as session:
+                return json.loads((await list_courses(db=session, **query)).body)
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(scenario())
+
+
+def test_list_courses_counts_only_on_page_pagination_by_default(db, create_course):
+    course, _, professor = create_course("Python do zero")
+    CoursesUseCases(db).create_course(CourseSchema(title="FastAPI", description="APIs", professor_id=professor.id))
+
+    first_page = _list_courses()
+    assert first_page["total"] == 2
+    assert first_page["next_cursor"]
+
+    next_page = _list_courses(cursor=first_page["next_cursor"])
+    assert next_page["total"] is None
+    assert [item["id"] for item in next_page["results"]] == [course.id]
+    assert _list_courses(cursor=first_page["next_cursor"], include_total=True)["total"] == 2
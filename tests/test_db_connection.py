@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, text
+
+from app.core import db_connection
+from app.core.db_connection import ReplicaRoutingSession
+
+
+def _engine(origin: str):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE origin (name TEXT)"))
+        conn.execute(text("INSERT INTO origin VALUES (:name)"), {"name": origin})
+    return engine
+
+
+def test_use_primary_bind_argument_skips_replica(monkeypatch):
+    primary, replica = _engine("primary"), _engine("replica")
+    monkeypatch.setattr(db_connection, "async_replica_engine", SimpleNamespace(sync_engine=replica))
+
+    session = ReplicaRoutingSession(bind=primary)
+    session.info["read_only"] = True
+    try:
+        query = text("SELECT name FROM origin")
+        assert session.execute(query).scalar() == "replica"
+        assert session.execute(query, bind_arguments={"use_primary": True}).scalar() == "primary"
+    finally:
+        session.close()
+
+
+def test_reads_from_replica_follows_session_state(monkeypatch):
+    session = ReplicaRoutingSession(bind=_engine("primary"))
+    session.info["read_only"] = True
+    try:
+        assert not db_connection.reads_from_replica(session)
+
+        monkeypatch.setattr(db_connection, "async_replica_engine", SimpleNamespace(sync_engine=_engine("replica")))
+        assert db_connection.reads_from_replica(session)
+
+        session.info["wrote"] = True
+        assert not db_connection.reads_from_replica(session)
+    finally:
+        session.close()
@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.main import app
+from app.schemas import Principal
+from app.utils import require_professor
+
+
+def test_require_professor_rejects_students():
+    with pytest.raises(HTTPException) as rejected:
+        asyncio.run(require_professor(Principal(id=1, username="aluno", type_user="A")))
+    assert rejected.value.status_code == 403
+
+
+def test_require_professor_accepts_professors():
+    professor = Principal(id=2, username="prof", type_user="P")
+    assert asyncio.run(require_professor(professor)) is professor
+
+
+def test_stats_route_requires_professor():
+    route = next(route for route in app.routes if getattr(route, "path", None) == "/stats/")
+    assert any(dependency.call is require_professor for dependency in route.dependant.dependencies)
@@ -0,0 +1,21 @@
+from app.core.hashing import HashingPool
+
+
+def test_map_keeps_order_across_small_chunks():
+    pool = HashingPool(workers=2, max_pending=2, timeout=10)
+    try:
+        items = [f"senha-{index}" for index in range(25)]
+        assert pool.map("bulk_hash", str.upper, items, chunk_size=3) == [item.upper() for item in items]
+    finally:
+        pool.shutdown()
+
+
+def test_map_does_not_touch_request_queue():
+    # Lotes não contam em `pending`: login/registro continuam sendo aceitos durante a importação.
+    pool = HashingPool(workers=1, max_pending=1, timeout=10)
+    try:
+        pool.map("bulk_hash", str.upper, ["a", "b", "c"], chunk_size=1)
+        assert pool.stats()["pending"] == 0
+        assert pool.stats()["rejected"] == 0
+    finally:
+        pool.shutdown()
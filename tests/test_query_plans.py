@@ -0,0 +1,44 @@
+"""Mesma checagem de scripts/check_query_plans.py, contra uma base mínima criada no teste.
+
+Com enable_seqscan=off, um Seq Scan filtrado só sobra no plano quando nenhum índice serve a query.
+"""
+import importlib.util
+from pathlib import Path
+
+from app.models import LessonQuiz, QuizOption, QuizQuestion
+from app.repositories import LessonUseCases, UserUseCases
+from app.schemas import Lesson as LessonSchema, Principal
+
+SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "check_query_plans.py"
+
+
+def _load_script():
+    spec = importlib.util.spec_from_file_location("check_query_plans", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_repository_queries_do_not_seq_scan(db, create_user, create_course):
+    course, module, professor = create_course("Python do zero")
+    lesson = LessonUseCases(db).create(LessonSchema(title="Quiz 1", content_type="Q", module_id=module.id), professor)
+    quiz = LessonQuiz(lesson_id=lesson.id)
+    db.add(quiz)
+    db.flush()
+    question = QuizQuestion(quiz_id=quiz.id, question_text="2 + 2?")
+    db.add(question)
+    db.flush()
+    db.add(QuizOption(question_id=question.id, option_text="4", is_correct=True))
+    db.commit()
+
+    student = create_user("aluno")
+    principal = Principal(id=student.id, username=student.username, type_user=student.type_user)
+    UserUseCases(db).enroll(principal, course.id)
+    UserUseCases(db).complete_lesson(principal, lesson.id)
+
+    failures = _load_script().find_seq_scans(db)
+
+    assert failures == [], "\n".join(
+        f"[{name}] {relation}: {condition}\n    {statement[:300]}"
+        for name, relation, condition, statement in failures
+    )
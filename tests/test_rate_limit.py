@@ -0,0 +1,35 @@
+from starlette.requests import Request
+
+from app.core.rate_limit import client_ip, parse_trusted_proxies
+
+
+TRUSTED = parse_trusted_proxies(["10.0.0.0/8", "127.0.0.1"])
+
+
+def _request(peer: str, forwarded_for: str | None = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 4321)})
+
+
+def test_ignores_forwarded_for_without_trusted_proxies():
+    assert client_ip(_request("203.0.113.7", "198.51.100.1"), trusted_proxies=()) == "203.0.113.7"
+
+
+def test_ignores_forwarded_for_from_untrusted_peer():
+    assert client_ip(_request("203.0.113.7", "198.51.100.1"), trusted_proxies=TRUSTED) == "203.0.113.7"
+
+
+def test_uses_first_untrusted_hop_behind_trusted_proxies():
+    # O cliente forjou "1.2.3.4"; o proxy de borda anexou o IP real e o interno, o da borda.
+    request = _request("10.0.0.2", "1.2.3.4, 198.51.100.1, 10.0.0.5")
+    assert client_ip(request, trusted_proxies=TRUSTED) == "198.51.100.1"
+
+
+def test_clients_behind_same_proxy_get_distinct_keys():
+    first = client_ip(_request("127.0.0.1", "198.51.100.1"), trusted_proxies=TRUSTED)
+    second = client_ip(_request("127.0.0.1", "198.51.100.2"), trusted_proxies=TRUSTED)
+    assert first != second
+
+
+def test_falls_back_to_peer_without_forwarded_for():
+    assert client_ip(_request("10.0.0.2"), trusted_proxies=TRUSTED) == "10.0.0.2"
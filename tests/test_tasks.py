@@ -0,0 +1,28 @@
+import asyncio
+from threading import Event
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.tasks import BoundedExecutor
+
+
+def test_bounded_executor_rejects_when_full():
+    executor = BoundedExecutor("test-jobs", workers=1, max_pending=1)
+    release = Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as rejected:
+            await executor.run(lambda: None)
+        release.set()
+        assert await running is True
+        return rejected.value.status_code
+
+    try:
+        assert asyncio.run(scenario()) == 503
+        assert executor.stats()["pending"] == 0
+        assert executor.stats()["rejected"] == 1
+    finally:
+        executor.shutdown()
@@ -0,0 +1,69 @@
+from app.models import CourseEnrollment
+from app.repositories import LessonUseCases, UserUseCases
+from app.repositories import user_repo
+from app.schemas import Lesson as LessonSchema, Principal
+
+
+def test_enroll_seeds_bitmap_from_lessons_completed_before(db, create_user, create_course, monkeypatch):
+    monkeypatch.setattr(user_repo, "LESSON_COMPLETION_BITMAP", True)
+    course, module, professor = create_course("Python do zero")
+    lessons = [
+        LessonUseCases(db).create(LessonSchema(title=f"Aula {n}", content_type="V", module_id=module.id), professor)
+        for n in range(17)
+    ]
+    student = create_user("aluno")
+    principal = Principal(id=student.id, username=student.username, type_user=student.type_user)
+    users = UserUseCases(db)
+
+    # Ordinais 1 e 16: o byte do meio fica zerado.
+    done_before = [lessons[1], lessons[16]]
+    for lesson in done_before:
+        users.complete_lesson(principal, lesson.id)
+    users.enroll(principal, course.id)
+
+    enrollment = db.query(CourseEnrollment).filter(CourseEnrollment.user_id == student.id).one()
+    assert enrollment.completed_bitmap == user_repo._bitmap_from_ordinals([1, 16])
+    assert sorted(users.get_completed_lesson_ids_by_course(principal, course.id)) == [lesson.id for lesson in done_before]
+    certificate = users.get_course_certificate_payload(principal, course.id)
+    assert (certificate["completed_lessons"], certificate["eligible"]) == (2, False)
+
+    for lesson in lessons:
+        if lesson not in done_before:
+            users.complete_lesson(principal, lesson.id)
+    db.expire_all()
+    certificate = users.get_course_certificate_payload(principal, course.id)
+    assert (certificate["completed_lessons"], certificate["eligible"]) == (17, True)
+
+
+def test_enroll_without_completions_leaves_bitmap_empty(db, create_user, create_course):
+    course, _, _ = create_course("Python do zero")
+    student = create_user("aluno")
+    UserUseCases(db).enroll(Principal(id=student.id, username=student.username, type_user=student.type_user), course.id)
+
+    enrollment = db.query(CourseEnrollment).filter(CourseEnrollment.user_id == student.id).one()
+    assert (enrollment.completed_lessons, enrollment.completed_bitmap) == (0, None)
+
+
+def test_reconcile_progress_counters_fixes_every_batch(db, create_user, create_course):
+    from app.models import Course
+
+    first, first_module, first_owner = create_course("Python do zero", professor_username="prof1")
+    second, _, _ = create_course("FastAPI", professor_username="prof2")
+    lesson = LessonUseCases(db).create(LessonSchema(title="Aula 1", content_type="V", module_id=first_module.id), first_owner)
+    student = create_user("aluno")
+    principal = Principal(id=student.id, username=student.username, type_user=student.type_user)
+    users = UserUseCases(db)
+    users.enroll(principal, first.id)
+    users.enroll(principal, second.id)
+    users.complete_lesson(principal, lesson.id)
+
+    # Contadores divergentes nos dois cursos, como depois de um SQL manual.
+    db.query(Course).update({"lesson_count": 7})
+    db.query(CourseEnrollment).update({"completed_lessons": 3})
+    db.commit()
+
+    assert users.reconcile_progress_counters(batch_size=1) == {"courses": 2, "enrollments": 2}
+    db.expire_all()
+    assert {course.id: course.lesson_count for course in db.query(Course)} == {first.id: 1, second.id: 0}
+    assert {e.course_id: e.completed_lessons for e in db.query(CourseEnrollment)} == {first.id: 1, second.id: 0}
+    assert users.reconcile_progress_counters(batch_size=1) == {"courses": 0, "enrollments": 0}